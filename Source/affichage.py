@@ -1,5 +1,57 @@
+import hashlib
+import json
+from bisect import bisect_right
+from collections import OrderedDict
+
 import folium
 import numpy as np
+from folium.plugins import FastMarkerCluster
+
+from structure import RouteArrays, NO_TACK
+
+_COMPASS = np.array([
+    "Nord", "NNE", "NE", "ENE",
+    "Est", "ESE", "SE", "SSE",
+    "Sud", "SSO", "SO", "OSO",
+    "Ouest", "ONO", "NO", "NNO"
+])
+
+_ARROW_SVG_TEMPLATE = (
+    '<svg width="{size}" height="{size}" viewBox="0 0 24 24" '
+    'style="transform: rotate({rot}deg);">'
+    '<path d="M12 2 L12 18 M12 18 L8 14 M12 18 L16 14" '
+    'stroke="{color}" stroke-width="3" fill="none" '
+    'stroke-linecap="round" stroke-linejoin="round"/>'
+    '<circle cx="12" cy="20" r="2" fill="{color}"/>'
+    '</svg>'
+)
+
+# couleur des flèches par force de vent (kn): <10, <20, <30, au-delà
+_WIND_BREAKS = (10.0, 20.0, 30.0)
+_WIND_COLORS = ('#00ff00', '#ffff00', '#ff8800', '#ff0000')
+
+# couleur de route par allure (TWA): près, travers, largue, portant
+_TWA_BREAKS = (60.0, 110.0, 150.0)
+_TWA_COLORS = ("#2b6cb0", "#2f855a", "#dd6b20", "#c53030")
+_TWA_COLORS_ARR = np.array(_TWA_COLORS)
+
+# au-delà, les waypoints passent par FastMarkerCluster
+CLUSTER_THRESHOLD = 200
+
+# row = [lat, lon, popup_html, couleur, rayon]
+_WAYPOINT_MARKER_JS = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]),
+        {radius: row[4], color: row[3], fill: true, fillOpacity: 0.85});
+    marker.bindPopup(row[2], {maxWidth: 240});
+    return marker;
+}
+"""
+
+
+def _build_arrow_svg(size, color, rotation):
+    """DivIcon de flèche à partir de paramètres déjà calculés."""
+    return folium.DivIcon(html=_ARROW_SVG_TEMPLATE.format(size=size, rot=rotation, color=color))
 
 
 def create_wind_arrow_svg(direction_from_deg, speed_kn, max_speed_kn=40):
@@ -10,39 +62,20 @@ def create_wind_arrow_svg(direction_from_deg, speed_kn, max_speed_kn=40):
     """
     size = 25 + (speed_kn / max_speed_kn) * 25
     size = min(max(size, 20), 60)
-
-    if speed_kn < 10:
-        color = '#00ff00'
-    elif speed_kn < 20:
-        color = '#ffff00'
-    elif speed_kn < 30:
-        color = '#ff8800'
-    else:
-        color = '#ff0000'
-
+    color = _WIND_COLORS[bisect_right(_WIND_BREAKS, speed_kn)]
     rotation = (direction_from_deg + 180) % 360
-
-    svg = f"""
-    <svg width="{size}" height="{size}" viewBox="0 0 24 24"
-         style="transform: rotate({rotation}deg);">
-        <path d="M12 2 L12 18 M12 18 L8 14 M12 18 L16 14"
-              stroke="{color}" stroke-width="3" fill="none"
-              stroke-linecap="round" stroke-linejoin="round"/>
-        <circle cx="12" cy="20" r="2" fill="{color}"/>
-    </svg>
-    """
-    return folium.DivIcon(html=svg)
+    return _build_arrow_svg(size, color, rotation)
 
 
 def get_wind_compass(direction):
-    directions = [
-        "Nord", "NNE", "NE", "ENE",
-        "Est", "ESE", "SE", "SSE",
-        "Sud", "SSO", "SO", "OSO",
-        "Ouest", "ONO", "NO", "NNO"
-    ]
     idx = int((direction + 11.25) / 22.5) % 16
-    return directions[idx]
+    return str(_COMPASS[idx])
+
+
+def get_wind_compass_vec(directions):
+    """Version vectorisée de get_wind_compass (tableau de directions)."""
+    idx = ((np.asarray(directions) + 11.25) / 22.5).astype(np.intp) % 16
+    return _COMPASS[idx]
 
 
 def _color_from_twa(twa):
@@ -54,50 +87,105 @@ def _color_from_twa(twa):
     """
     if twa is None:
         return "blue"
-    if twa < 60:
-        return "#2b6cb0"
-    if twa < 110:
-        return "#2f855a"
-    if twa < 150:
-        return "#dd6b20"
-    return "#c53030"
+    return _TWA_COLORS[bisect_right(_TWA_BREAKS, twa)]
+
+
+def _color_from_twa_vec(twas):
+    """Version vectorisée de _color_from_twa (NaN => TWA inconnu)."""
+    twas = np.asarray(twas, dtype=float)
+    colors = _TWA_COLORS_ARR[np.digitize(twas, _TWA_BREAKS)].astype(object)
+    colors[np.isnan(twas)] = "blue"
+    return colors
 
 
-def _segment_route(route_waypoints):
+def _segment_route(ra):
     """
     Segmente la route en tronçons homogènes (même tack approx),
     et garde les points clés (manœuvres).
+    Retourne (débuts, fins) inclusifs: le point de coupure appartient aux
+    deux tronçons pour garder un tracé continu.
     """
-    if not route_waypoints:
-        return []
-
-    segments = []
-    current = [route_waypoints[0]]
-
-    for i in range(1, len(route_waypoints)):
-        prev = route_waypoints[i - 1]
-        wp = route_waypoints[i]
-
-        # changement d'amure => nouvelle section
-        if prev.get("tack") is not None and wp.get("tack") is not None and prev.get("tack") != wp.get("tack"):
-            current.append(wp)
-            segments.append(current)
-            current = [wp]
-            continue
+    n = len(ra)
+    if n == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
 
-        # manœuvre explicitement détectée
-        if wp.get("maneuver") in ("tack", "gybe"):
-            current.append(wp)
-            segments.append(current)
-            current = [wp]
-            continue
+    tacks = ra.tacks
+    mans = ra.maneuvers
+    # on continue le tronçon si même amure (ou amure inconnue) et pas de manœuvre
+    same_tack = (tacks[1:] == tacks[:-1]) | (tacks[1:] == NO_TACK) | (tacks[:-1] == NO_TACK)
+    no_man = (mans[1:] != "tack") & (mans[1:] != "gybe")
+    split_points = np.flatnonzero(~(same_tack & no_man)) + 1
 
-        current.append(wp)
+    starts = np.concatenate(([0], split_points))
+    ends = np.concatenate((split_points, [n - 1]))
+    keep = ends > starts
+    return starts[keep], ends[keep]
 
-    if len(current) >= 2:
-        segments.append(current)
 
-    return segments
+def _segment_means(values, seg_starts, seg_ends):
+    """
+    Moyenne de values sur chaque segment [début, fin] inclusif, NaN ignorés
+    (NaN si aucun point valide). Un seul np.add.reduceat pour tous les segments.
+    """
+    if seg_starts.size == 0:
+        return np.empty(0)
+    valid = ~np.isnan(values)
+    # un élément neutre en fin pour que fin + 1 reste un indice valide
+    filled = np.append(np.where(valid, values, 0.0), 0.0)
+    ones = np.append(valid, False).astype(np.int64)
+    idx = np.column_stack((seg_starts, seg_ends + 1)).ravel()
+    sums = np.add.reduceat(filled, idx)[::2]
+    counts = np.add.reduceat(ones, idx)[::2]
+    means = np.full(sums.shape, np.nan)
+    np.divide(sums, counts, out=means, where=counts > 0)
+    return means
+
+
+# cache LRU des cartes déjà rendues: clé du contenu -> (HTML, carte)
+_MAP_CACHE = OrderedDict()
+MAP_CACHE_SIZE = 8
+
+
+def _map_cache_key(route_waypoints, start, end):
+    """Empreinte des entrées de la carte (route, extrémités)."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps([list(start), list(end), route_waypoints or []],
+                        default=str, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def _write_html(filename, html):
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(html)
+
+
+def _waypoint_popup(ra, i, compass):
+    """HTML du popup d'un waypoint (indice i dans RouteArrays)."""
+    wind_speed = ra.wind_speed[i]
+    wind_dir = ra.wind_direction[i]
+
+    wind_info = "🌬️ Vent: N/A"
+    if not (np.isnan(wind_speed) or np.isnan(wind_dir)):
+        wind_info = f"🌬️ Vent: {wind_speed:.1f} kn @ {wind_dir:.0f}° ({compass})"
+
+    man = ra.maneuvers[i]
+    man_info = ""
+    if man == "tack":
+        man_info = "<br>🔁 Virement de bord"
+    elif man == "gybe":
+        man_info = "<br>🔁 Empannage"
+
+    return f"""
+    <b>Waypoint {i}</b><br>
+    <hr style="margin: 3px 0;">
+    📍 ({ra.lats[i]:.2f}°, {ra.lons[i]:.2f}°)<br>
+    ⏰ {ra.timestamps[i].strftime('%d/%m %H:%M')}<br>
+    🧭 Cap: {ra.heading[i]:.0f}°<br>
+    ⛵ Vitesse: {ra.boat_speed[i]:.1f} kn<br>
+    🎯 TWA: {ra.twa[i]:.0f}°<br>
+    {wind_info}
+    {man_info}
+    """
 
 
 def route_to_folium_with_wind(route_waypoints, start, end,
@@ -112,6 +200,17 @@ def route_to_folium_with_wind(route_waypoints, start, end,
     print("GÉNÉRATION CARTE AVEC VENT")
     print("=" * 70 + "\n")
 
+    # entrées identiques: on réécrit le HTML déjà généré (le fichier a pu
+    # être écrasé entre-temps par une autre carte)
+    cache_key = _map_cache_key(route_waypoints, start, end)
+    cached = _MAP_CACHE.get(cache_key)
+    if cached is not None:
+        _MAP_CACHE.move_to_end(cache_key)
+        html, cached_map = cached
+        _write_html(filename, html)
+        print(f"✓ Carte inchangée, reprise du cache: {filename}")
+        return cached_map
+
     center_lat = (start[0] + end[0]) / 2
     center_lon = (start[1] + end[1]) / 2
 
@@ -121,73 +220,72 @@ def route_to_folium_with_wind(route_waypoints, start, end,
         tiles='OpenStreetMap'
     )
 
+    # calques: tout est ajouté aux groupes, puis chaque groupe une seule fois à la carte
+    route_group = folium.FeatureGroup(name='Route', show=True)
+    wp_group = folium.FeatureGroup(name='Waypoints')
+
+    # conversion unique en tableaux (SoA) pour tout le rendu
+    ra = RouteArrays.from_dicts(route_waypoints) if route_waypoints else None
+
     # segments route
-    if route_waypoints:
-        segments = _segment_route(route_waypoints)
+    if ra is not None:
+        seg_starts, seg_ends = _segment_route(ra)
+        # couleur des segments: moyenne TWA, toutes calculées en une passe
+        seg_colors = _color_from_twa_vec(_segment_means(ra.twa, seg_starts, seg_ends))
 
-        for seg in segments:
-            coords = [(wp["lat"], wp["lon"]) for wp in seg]
-            # couleur du segment: moyenne TWA
-            twas = [wp.get("twa") for wp in seg if wp.get("twa") is not None]
-            twa_mean = float(np.mean(twas)) if twas else None
-            color = _color_from_twa(twa_mean)
+        for a, b, color in zip(seg_starts.tolist(), seg_ends.tolist(), seg_colors.tolist()):
+            coords = list(zip(ra.lats[a:b + 1].tolist(), ra.lons[a:b + 1].tolist()))
 
             folium.PolyLine(
                 coords,
                 color=color,
                 weight=4,
                 opacity=0.85
-            ).add_to(m)
+            ).add_to(route_group)
 
-        print(f"✓ Route tracée ({len(route_waypoints)} waypoints, {len(segments)} segments)")
+        print(f"✓ Route tracée ({len(ra)} waypoints, {len(seg_starts)} segments)")
 
     # waypoints: on en met moins + manœuvres
-    if route_waypoints:
-        step = max(1, len(route_waypoints) // 12)
-        idxs = set(range(0, len(route_waypoints), step))
-        for i, wp in enumerate(route_waypoints):
-            if i not in idxs and wp.get("maneuver") not in ("tack", "gybe"):
-                continue
-
-            wind_speed = wp.get("wind_speed")
-            wind_dir = wp.get("wind_direction")
-            twa = wp.get("twa")
-
-            wind_info = "🌬️ Vent: N/A"
-            if wind_speed is not None and wind_dir is not None:
-                wind_info = f"🌬️ Vent: {wind_speed:.1f} kn @ {wind_dir:.0f}° ({get_wind_compass(wind_dir)})"
-
-            man = wp.get("maneuver")
-            man_info = ""
-            if man == "tack":
-                man_info = "<br>🔁 Virement de bord"
-            elif man == "gybe":
-                man_info = "<br>🔁 Empannage"
-
-            popup_text = f"""
-            <b>Waypoint {i}</b><br>
-            <hr style="margin: 3px 0;">
-            📍 ({wp['lat']:.2f}°, {wp['lon']:.2f}°)<br>
-            ⏰ {wp['timestamp'].strftime('%d/%m %H:%M')}<br>
-            🧭 Cap: {wp['heading']:.0f}°<br>
-            ⛵ Vitesse: {wp['boat_speed']:.1f} kn<br>
-            🎯 TWA: {twa:.0f}°<br>
-            {wind_info}
-            {man_info}
-            """
-
+    # (au-delà de CLUSTER_THRESHOLD: tous les points, regroupés côté navigateur)
+    if ra is not None:
+        n = len(ra)
+        use_cluster = n > CLUSTER_THRESHOLD
+        if use_cluster:
+            selected = np.arange(n)
+        else:
+            step = max(1, n // 12)
+            man_idx = np.flatnonzero((ra.maneuvers == "tack") | (ra.maneuvers == "gybe"))
+            selected = np.union1d(np.arange(0, n, step), man_idx).astype(np.intp)
+        compass = get_wind_compass_vec(np.nan_to_num(ra.wind_direction[selected])).tolist()
+
+        markers = []
+        for k, i in enumerate(selected.tolist()):
+            man = ra.maneuvers[i]
             color = "blue" if man is None else ("purple" if man == "tack" else "orange")
-            folium.CircleMarker(
-                [wp["lat"], wp["lon"]],
-                radius=5 if man else 3,
-                popup=folium.Popup(popup_text, max_width=240),
-                color=color,
-                fill=True,
-                fillOpacity=0.85
-            ).add_to(m)
+            markers.append((float(ra.lats[i]), float(ra.lons[i]),
+                            _waypoint_popup(ra, i, compass[k]), color, 5 if man else 3))
+
+        if use_cluster:
+            # un seul tableau JSON + un constructeur JS, au lieu d'un script par marqueur
+            FastMarkerCluster([list(mk) for mk in markers],
+                              callback=_WAYPOINT_MARKER_JS).add_to(wp_group)
+        else:
+            for lat, lon, popup_text, color, radius in markers:
+                folium.CircleMarker(
+                    [lat, lon],
+                    radius=radius,
+                    popup=folium.Popup(popup_text, max_width=240),
+                    color=color,
+                    fill=True,
+                    fillOpacity=0.85
+                ).add_to(wp_group)
 
         print("✓ Waypoints échantillonnés + manœuvres marquées")
 
+    route_group.add_to(m)
+    wp_group.add_to(m)
+    folium.LayerControl().add_to(m)
+
     # départ / arrivée
     folium.Marker(
         start,
@@ -202,14 +300,14 @@ def route_to_folium_with_wind(route_waypoints, start, end,
     ).add_to(m)
 
     # légende
-    if route_waypoints:
-        duration_h = route_waypoints[-1]["g_cost"] / 3600.0
-        eta = route_waypoints[-1]["timestamp"].strftime('%d/%m %H:%M')
-
-        wind_speeds = [wp.get("wind_speed") for wp in route_waypoints if wp.get("wind_speed") is not None]
-        if wind_speeds:
-            avg_wind = float(np.mean(wind_speeds))
-            max_wind = float(np.max(wind_speeds))
+    if ra is not None:
+        duration_h = ra.g_cost[-1] / 3600.0
+        eta = ra.timestamps[-1].strftime('%d/%m %H:%M')
+
+        wind_speeds = ra.wind_speed[~np.isnan(ra.wind_speed)]
+        if wind_speeds.size:
+            avg_wind = float(wind_speeds.sum() / wind_speeds.size)
+            max_wind = float(wind_speeds.max())
             wind_stats = f"""
             <b>🌬️ Vent moyen:</b> {avg_wind:.1f} kn<br>
             <b>🌬️ Vent max:</b> {max_wind:.1f} kn<br>
@@ -229,7 +327,7 @@ def route_to_folium_with_wind(route_waypoints, start, end,
                     box-shadow: 3px 3px 10px rgba(0,0,0,0.3);">
             <b>🗺️ Route Maritime</b><br>
             <hr style="margin: 5px 0;">
-            <b>Waypoints:</b> {len(route_waypoints)}<br>
+            <b>Waypoints:</b> {len(ra)}<br>
             <b>Durée (coût):</b> {duration_h:.1f}h<br>
             <b>ETA:</b> {eta}<br>
             <hr style="margin: 5px 0;">
@@ -260,6 +358,10 @@ def route_to_folium_with_wind(route_waypoints, start, end,
         """
 
     m.get_root().html.add_child(folium.Element(legend_html))
-    m.save(filename)
+    html = m.get_root().render()
+    _write_html(filename, html)
+    _MAP_CACHE[cache_key] = (html, m)
+    if len(_MAP_CACHE) > MAP_CACHE_SIZE:
+        _MAP_CACHE.popitem(last=False)
     print(f"✓ Carte sauvegardée: {filename}")
     return m
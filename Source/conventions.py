@@ -1,4 +1,5 @@
 import math
+import numpy as np
 
 # ============================================================
 # Conventions & unités (centralisées)
@@ -20,13 +21,16 @@ import math
 MPS_TO_KNOT = 1.9438444924406048
 KNOT_TO_MPS = 1.0 / MPS_TO_KNOT
 
+DEG2RAD = math.pi / 180.0
+RAD2DEG = 180.0 / math.pi
+
 
 def deg2rad(deg: float) -> float:
-    return math.radians(deg)
+    return deg * DEG2RAD
 
 
 def rad2deg(rad: float) -> float:
-    return math.degrees(rad)
+    return rad * RAD2DEG
 
 
 def wrap_360(angle_deg: float) -> float:
@@ -60,6 +64,11 @@ def uv_to_wind_dir_from(u_ms: float, v_ms: float) -> float:
     return wrap_360(270.0 - rad2deg(math.atan2(v_ms, u_ms)))
 
 
+def uv_to_wind_dir_from_vec(u_ms, v_ms):
+    """Version vectorisée de uv_to_wind_dir_from (tableaux U/V)."""
+    return (270.0 - np.degrees(np.arctan2(v_ms, u_ms))) % 360.0
+
+
 def wind_dir_from_to_dir_to(dir_from_deg: float) -> float:
     """Direction 'vers où va le vent' = dir_from + 180."""
     return wrap_360(dir_from_deg + 180.0)
@@ -72,3 +81,9 @@ def compute_twa(heading_deg: float, wind_dir_from_deg: float) -> float:
     """
     delta = wrap_180(wind_dir_from_deg - heading_deg)
     return abs(delta)
+
+
+def compute_twa_vec(headings_deg, wind_dir_from_deg):
+    """Version vectorisée de compute_twa (caps et/ou directions en tableaux)."""
+    delta = (np.asarray(wind_dir_from_deg) - headings_deg + 180.0) % 360.0 - 180.0
+    return np.abs(delta)
@@ -1,95 +1,411 @@
+import math
 import rasterio
 import numpy as np
+from rasterio.transform import Affine
+from rasterio.windows import Window, from_bounds
+
+from outils import njit, HAS_NUMBA
+
+# disposition du masque mer en mémoire
+_LAYOUT_U8 = 0     # uint8 (H, W), une cellule par octet
+_LAYOUT_ROWS = 1   # bits packés par ligne (H, ceil(W/8))
+_LAYOUT_TILES = 2  # tuiles 8x8 de 8 octets (ceil(H/8), 8*ceil(W/8))
+
+
+@njit(cache=True)
+def _sea_cell_nb(sea_mask, layout, r, c):
+    """Lit la cellule (r, c) du masque (indices supposés dans la fenêtre)."""
+    if layout == _LAYOUT_TILES:
+        # tuile (r>>3, c>>3): octet r&7 de la tuile, bit c&7
+        return (sea_mask[r >> 3, ((c >> 3) << 3) | (r & 7)] >> (c & 7)) & 1 != 0
+    if layout == _LAYOUT_ROWS:
+        return (sea_mask[r, c >> 3] >> (7 - (c & 7))) & 1 != 0
+    return sea_mask[r, c] != 0
+
+
+@njit(cache=True, fastmath=True)
+def _path_clear_nb(sea_mask, layout, a, b, c, d, e, f, lat1, lon1, lat2, lon2, n, H, W):
+    """
+    Échantillonne le segment et s'arrête au premier point hors mer.
+    sea_mask: tableau uint8 dans la disposition layout (_LAYOUT_*).
+    """
+    for i in range(n + 1):
+        alpha = i / n
+        lat = lat1 + (lat2 - lat1) * alpha
+        lon = lon1 + (lon2 - lon1) * alpha
+        col = int(math.floor(a * lon + b * lat + c))
+        row = int(math.floor(d * lon + e * lat + f))
+        if row < 0 or row >= H or col < 0 or col >= W:
+            return False
+        if not _sea_cell_nb(sea_mask, layout, row, col):
+            return False
+    return True
+
+
+@njit(cache=True)
+def _cell_clear_nb(sea_mask, layout, r, c, H, W):
+    """Cellule (r, c) dans la fenêtre et en mer."""
+    if r < 0 or r >= H or c < 0 or c >= W:
+        return False
+    return _sea_cell_nb(sea_mask, layout, r, c)
+
+
+@njit(cache=True)
+def _supercover_clear_nb(sea_mask, layout, y0, x0, y1, x1, H, W):
+    """
+    Parcours de toutes les cellules dont l'intérieur est traversé par le
+    segment (x0, y0) -> (x1, y1), en coordonnées fractionnaires (colonne,
+    ligne) (Amanatides-Woo). Passage exact par un coin: les deux voisines
+    sont aussi testées. S'arrête à la première cellule terre ou hors fenêtre.
+    """
+    r = int(math.floor(y0))
+    c = int(math.floor(x0))
+    r_end = int(math.floor(y1))
+    c_end = int(math.floor(x1))
+    dx = x1 - x0
+    dy = y1 - y0
+    sc = 1 if dx > 0.0 else -1
+    sr = 1 if dy > 0.0 else -1
+    # paramètre t (0..1) du prochain franchissement de colonne / de ligne
+    if dx != 0.0:
+        t_dx = abs(1.0 / dx)
+        t_x = ((c + 1.0 - x0) if dx > 0.0 else (x0 - c)) * t_dx
+    else:
+        t_dx = math.inf
+        t_x = math.inf
+    if dy != 0.0:
+        t_dy = abs(1.0 / dy)
+        t_y = ((r + 1.0 - y0) if dy > 0.0 else (y0 - r)) * t_dy
+    else:
+        t_dy = math.inf
+        t_y = math.inf
+
+    if not _cell_clear_nb(sea_mask, layout, r, c, H, W):
+        return False
+    n = abs(c_end - c) + abs(r_end - r)
+    while n > 0:
+        if (t_x < t_y or r == r_end) and c != c_end:
+            c += sc
+            t_x += t_dx
+            n -= 1
+        elif (t_y < t_x or c == c_end) and r != r_end:
+            r += sr
+            t_y += t_dy
+            n -= 1
+        else:
+            # coin exact: les deux cellules adjacentes, puis la diagonale
+            if not (_cell_clear_nb(sea_mask, layout, r, c + sc, H, W) and
+                    _cell_clear_nb(sea_mask, layout, r + sr, c, H, W)):
+                return False
+            c += sc
+            r += sr
+            t_x += t_dx
+            t_y += t_dy
+            n -= 2
+        if not _cell_clear_nb(sea_mask, layout, r, c, H, W):
+            return False
+    return True
 
 
 class LandMask:
     """Gestionnaire du masque terre/mer avec détection automatique."""
 
-    def __init__(self, tif_path="landmask.tif", verbose=True):
+    def __init__(self, tif_path="landmask.tif", verbose=True, bbox=None, packed=False,
+                 overview_level=None, tiled=False):
+        """
+        bbox = (lat_min, lat_max, lon_min, lon_max): seule cette fenêtre du
+        raster est chargée en mémoire (tout le raster si None).
+        packed=True: masque stocké à 1 bit/pixel (8x moins de mémoire).
+        tiled=True: 1 bit/pixel en tuiles 8x8 (8 octets contigus par tuile):
+        les voisins verticaux d'une cellule sont dans la même ligne de cache.
+        overview_level=k: lecture décimée d'un facteur 2**k (aperçus du TIFF
+        utilisés par GDAL s'ils existent).
+        """
         self.dataset = None
-        self.data = None
+        self.packed = packed
+        self.tiled = tiled
+        self.sea_mask = None
+        self.sea_packed = None
+        self.sea_tiles = None
         self.sea_value = None
         self.land_value = None
+        self.verbose = verbose
+        self._inv_transform = None
+        self._inv_coefs = None  # (a, b, c, d, e, f) de _inv_transform, en floats
+        self._H = 0
+        self._W = 0
+        self._oob_count = 0  # requêtes hors fenêtre chargée
 
         try:
-            self.dataset = rasterio.open(tif_path)
-            self.data = self.dataset.read(1)
+            self.dataset = rasterio.open(tif_path, sharing=False)
 
             if verbose:
-                print(f"✓ Landmask chargé: {tif_path}")
-                print(f"  Dimensions: {self.data.shape}")
+                print(f"✓ Landmask ouvert: {tif_path}")
+                print(f"  Dimensions: {(self.dataset.height, self.dataset.width)}")
                 print(f"  Bounds: {self.dataset.bounds}")
 
-            unique_values = np.unique(self.data)
+            self._detect_convention()
+            self.prepare(bbox, overview_level)
 
-            counts = {int(val): int(np.sum(self.data == val)) for val in unique_values}
+        except Exception as e:
             if verbose:
-                print(f"  Valeurs uniques dans le raster: {unique_values}")
-                print(f"  Répartition: {counts}")
+                print(f"✗ Erreur chargement landmask: {e}")
+            self.dataset = None
+            self.sea_mask = None
 
-            if 255 in unique_values:
-                self.sea_value = 0
-                self.land_value = 255
-                if verbose:
-                    print("  ✓ Convention détectée: 0=eau, 255=terre (GSHHS)")
-            elif 100 in unique_values:
+    def _band_counts(self):
+        """
+        Effectif de chaque valeur sur la bande complète, lue bloc par bloc
+        (mémoire bornée; une lecture décimée peut manquer une terre clairsemée).
+        """
+        counts = {}
+        for _, window in self.dataset.block_windows(1):
+            block = self.dataset.read(1, window=window)
+            if block.dtype == np.uint8:
+                hist = np.bincount(block.ravel(), minlength=256)
+                values = np.flatnonzero(hist)
+                value_counts = hist[values]
+            else:
+                values, value_counts = np.unique(block, return_counts=True)
+            for v, n in zip(values.tolist(), value_counts.tolist()):
+                counts[v] = counts.get(v, 0) + n
+        return counts
+
+    def _detect_convention(self):
+        """
+        Détecte la convention eau/terre sur la bande complète du raster
+        (une fenêtre locale peut ne contenir que de la mer).
+        """
+        verbose = self.verbose
+        counts = self._band_counts()
+        unique_values = sorted(counts)
+        if verbose:
+            print(f"  Valeurs uniques dans le raster: {unique_values}")
+            print(f"  Répartition: {counts}")
+
+        if 255 in unique_values:
+            self.sea_value = 0
+            self.land_value = 255
+            if verbose:
+                print("  ✓ Convention détectée: 0=eau, 255=terre (GSHHS)")
+        elif 100 in unique_values:
+            self.sea_value = 0
+            self.land_value = 100
+            if verbose:
+                print("  ✓ Convention détectée: 0=eau, 100=terre (Zenodo)")
+        elif len(unique_values) == 2 and 0 in unique_values and 1 in unique_values:
+            count_0 = counts[0]
+            count_1 = counts[1]
+            if count_0 > count_1:
                 self.sea_value = 0
-                self.land_value = 100
+                self.land_value = 1
                 if verbose:
-                    print("  ✓ Convention détectée: 0=eau, 100=terre (Zenodo)")
-            elif len(unique_values) == 2 and 0 in unique_values and 1 in unique_values:
-                count_0 = counts[0]
-                count_1 = counts[1]
-                if count_0 > count_1:
-                    self.sea_value = 0
-                    self.land_value = 1
-                    if verbose:
-                        print("  ✓ Convention détectée: 0=eau, 1=terre")
-                else:
-                    self.sea_value = 1
-                    self.land_value = 0
-                    if verbose:
-                        print("  ✓ Convention détectée: 1=eau, 0=terre")
+                    print("  ✓ Convention détectée: 0=eau, 1=terre")
             else:
                 self.sea_value = 1
                 self.land_value = 0
                 if verbose:
-                    print("  Convention par défaut: 1=eau, 0=terre")
-
+                    print("  ✓ Convention détectée: 1=eau, 0=terre")
+        else:
+            self.sea_value = 1
+            self.land_value = 0
             if verbose:
-                print(f"  → Valeur mer: {self.sea_value}, Valeur terre: {self.land_value}")
+                print("  Convention par défaut: 1=eau, 0=terre")
 
-        except Exception as e:
-            if verbose:
-                print(f"✗ Erreur chargement landmask: {e}")
-            self.dataset = None
-            self.data = None
+        if verbose:
+            print(f"  → Valeur mer: {self.sea_value}, Valeur terre: {self.land_value}")
+
+    def prepare(self, bbox=None, overview_level=None):
+        """
+        Charge la fenêtre du raster couvrant bbox = (lat_min, lat_max, lon_min, lon_max)
+        (tout le raster si None) et construit le masque mer correspondant.
+        overview_level=k: résolution divisée par 2**k.
+        À appeler une fois avant le routage: hors fenêtre, tout est considéré terre.
+        """
+        full = Window(0, 0, self.dataset.width, self.dataset.height)
+        if bbox is None:
+            window = full
+        else:
+            lat_min, lat_max, lon_min, lon_max = bbox
+            window = from_bounds(lon_min, lat_min, lon_max, lat_max, self.dataset.transform)
+            # pixels partiellement couverts inclus: offsets arrondis vers le bas,
+            # bords est/sud vers le haut (un arrondi au plus proche en retirait un)
+            row0 = math.floor(window.row_off)
+            col0 = math.floor(window.col_off)
+            row1 = math.ceil(window.row_off + window.height)
+            col1 = math.ceil(window.col_off + window.width)
+            window = Window(col0, row0, col1 - col0, row1 - row0).intersection(full)
+
+        transform = self.dataset.window_transform(window)
+        if overview_level:
+            h, w = int(window.height), int(window.width)
+            out_shape = (max(1, h // 2 ** overview_level), max(1, w // 2 ** overview_level))
+            data = self.dataset.read(1, window=window, out_shape=out_shape)
+            # pixels plus gros: mise à l'échelle de la transformée de la fenêtre
+            transform = transform * Affine.scale(w / out_shape[1], h / out_shape[0])
+        else:
+            data = self.dataset.read(1, window=window)
+        self._inv_transform = ~transform
+        self._inv_coefs = tuple(float(x) for x in self._inv_transform[:6])
+        self._H, self._W = data.shape
+
+        # masque booléen calculé une fois: plus de comparaison par requête
+        sea = np.ascontiguousarray(data == self.sea_value)
+        self.sea_mask = None
+        self.sea_packed = None
+        self.sea_tiles = None
+        if self.tiled:
+            H, W = sea.shape
+            Hp, Wp = -(-H // 8) * 8, -(-W // 8) * 8
+            padded = np.zeros((Hp, Wp), dtype=bool)
+            padded[:H, :W] = sea
+            # (tuile y, tuile x, ligne, colonne) -> 8 octets par tuile, bit = colonne
+            tiles = padded.reshape(Hp // 8, 8, Wp // 8, 8).transpose(0, 2, 1, 3)
+            self.sea_tiles = np.ascontiguousarray(
+                np.packbits(tiles, axis=-1, bitorder='little').reshape(Hp // 8, Wp))
+        elif self.packed:
+            self.sea_packed = np.packbits(sea, axis=1)
+        else:
+            self.sea_mask = sea
+
+        if self.verbose:
+            print(f"  Fenêtre chargée: {data.shape} (offset ligne {window.row_off}, colonne {window.col_off})")
 
     def is_sea(self, lat, lon):
-        """True si mer, False si terre (sécurité: hors limites/erreur => terre)."""
+        """True si mer, False si terre (sécurité: hors limites => terre)."""
         if self.dataset is None:
             return True
 
-        try:
-            row, col = self.dataset.index(lon, lat)
-            if row < 0 or row >= self.data.shape[0] or col < 0 or col >= self.data.shape[1]:
-                return False
-            value = self.data[row, col]
-            return bool(value == self.sea_value)
-        except Exception:
+        # affine inverse déroulée (pas d'appel Affine.__mul__ par requête)
+        a, b, c, d, e, f = self._inv_coefs
+        col = int(math.floor(a * lon + b * lat + c))
+        row = int(math.floor(d * lon + e * lat + f))
+        if row < 0 or row >= self._H or col < 0 or col >= self._W:
+            self._oob_count += 1
             return False
+        if self.tiled:
+            return bool((self.sea_tiles[row >> 3, ((col >> 3) << 3) | (row & 7)] >> (col & 7)) & 1)
+        if self.packed:
+            return bool((self.sea_packed[row, col >> 3] >> (7 - (col & 7))) & 1)
+        return bool(self.sea_mask[row, col])
 
-    def is_path_clear(self, lat1, lon1, lat2, lon2, n_samples=8):
-        """Vérifie qu'un segment ne traverse pas la terre."""
-        for i in range(n_samples + 1):
-            a = i / n_samples
-            lat = lat1 + (lat2 - lat1) * a
-            lon = lon1 + (lon2 - lon1) * a
-            if not self.is_sea(lat, lon):
+    def is_sea_vec(self, lats, lons):
+        """
+        Version vectorisée de is_sea: un seul gather dans le masque pour
+        tout un lot de positions (hors fenêtre => terre).
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        if self.dataset is None:
+            return np.ones(lats.shape, dtype=bool)
+
+        a, b, c, d, e, f = self._inv_coefs
+        cols = np.floor(a * lons + b * lats + c).astype(np.intp)
+        rows = np.floor(d * lons + e * lats + f).astype(np.intp)
+        inside = (rows >= 0) & (rows < self._H) & (cols >= 0) & (cols < self._W)
+        self._oob_count += int(inside.size - np.count_nonzero(inside))
+
+        out = np.zeros(lats.shape, dtype=bool)
+        out[inside] = self._sea_at(rows[inside], cols[inside])
+        return out
+
+    def _mask_layout(self):
+        """(masque uint8, disposition _LAYOUT_*) pour les noyaux compilés."""
+        if self.tiled:
+            return self.sea_tiles, _LAYOUT_TILES
+        if self.packed:
+            return self.sea_packed, _LAYOUT_ROWS
+        return self.sea_mask.view(np.uint8), _LAYOUT_U8
+
+    def _sea_at(self, rows, cols):
+        """Lecture vectorisée du masque (indices supposés dans la fenêtre)."""
+        if self.tiled:
+            return ((self.sea_tiles[rows >> 3, ((cols >> 3) << 3) | (rows & 7)]
+                     >> (cols & 7)) & 1).astype(bool)
+        if self.packed:
+            return ((self.sea_packed[rows, cols >> 3] >> (7 - (cols & 7))) & 1).astype(bool)
+        return self.sea_mask[rows, cols]
+
+    def _segment_in_window(self, lat1, lon1, lat2, lon2):
+        """
+        True si les deux extrémités sont dans la fenêtre chargée (rectangulaire:
+        le segment entier l'est aussi). Sinon compte une requête hors zone,
+        comme is_sea.
+        """
+        a, b, c, d, e, f = self._inv_coefs
+        for lat, lon in ((lat1, lon1), (lat2, lon2)):
+            y = d * lon + e * lat + f
+            x = a * lon + b * lat + c
+            if y < 0.0 or y >= self._H or x < 0.0 or x >= self._W:
+                self._oob_count += 1
                 return False
         return True
 
+    def is_path_clear_vec(self, lat1, lon1, lat2, lon2, n=8):
+        """
+        Version vectorisée: tous les points du segment sont convertis en
+        (row, col) d'un coup via la transformée affine inverse.
+        """
+        if self.dataset is None:
+            return True
+        if not self._segment_in_window(lat1, lon1, lat2, lon2):
+            return False
+
+        alphas = np.linspace(0.0, 1.0, n + 1)
+        lats = lat1 + (lat2 - lat1) * alphas
+        lons = lon1 + (lon2 - lon1) * alphas
+
+        cols, rows = self._inv_transform * (lons, lats)
+        rows = np.floor(rows).astype(np.intp)
+        cols = np.floor(cols).astype(np.intp)
+
+        in_bounds = (rows >= 0) & (rows < self._H) & (cols >= 0) & (cols < self._W)
+        if not in_bounds.all():
+            return False
+        return bool(self._sea_at(rows, cols).all())
+
+    def is_path_clear(self, lat1, lon1, lat2, lon2, n_samples=8):
+        """
+        Vérifie qu'un segment ne traverse pas la terre (n_samples + 1 points
+        échantillonnés; cf. is_path_clear_exact pour toutes les cellules).
+        """
+        if self.dataset is None:
+            return True
+        if not self._segment_in_window(lat1, lon1, lat2, lon2):
+            return False
+        if HAS_NUMBA:
+            a, b, c, d, e, f = self._inv_coefs
+            mask, layout = self._mask_layout()
+            return bool(_path_clear_nb(mask, layout, a, b, c, d, e, f,
+                                       float(lat1), float(lon1), float(lat2), float(lon2),
+                                       n_samples, self._H, self._W))
+        return self.is_path_clear_vec(lat1, lon1, lat2, lon2, n=n_samples)
+
+    def is_path_clear_exact(self, lat1, lon1, lat2, lon2):
+        """
+        Variante exacte: teste toutes les cellules traversées par le segment
+        (supercover), aucune cellule terre ne peut passer entre deux échantillons.
+        """
+        if self.dataset is None:
+            return True
+        if not self._segment_in_window(lat1, lon1, lat2, lon2):
+            return False
+        a, b, c, d, e, f = self._inv_coefs
+        y0 = d * lon1 + e * lat1 + f
+        x0 = a * lon1 + b * lat1 + c
+        y1 = d * lon2 + e * lat2 + f
+        x1 = a * lon2 + b * lat2 + c
+        mask, layout = self._mask_layout()
+        return bool(_supercover_clear_nb(mask, layout, y0, x0, y1, x1, self._H, self._W))
+
+    @property
+    def oob_count(self):
+        """Nombre de requêtes tombées hors de la fenêtre chargée (comptées terre)."""
+        return self._oob_count
+
     def close(self):
+        if self.verbose and self._oob_count:
+            print(f"  Landmask: {self._oob_count} requêtes hors zone (considérées terre)")
         if self.dataset:
             self.dataset.close()
 
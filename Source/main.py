@@ -9,7 +9,7 @@ import numpy as np
 from datetime import datetime
 
 # Imports locaux
-from outils import haversine
+from outils import haversine_vec
 from polaire import load_polar_diagram
 from meteo import load_grib_wind_fields
 from routeur import calculate_route_astar_fixed
@@ -42,16 +42,8 @@ def main():
     print(f"  Zone: lat [{meta['lat_range'][0]:.2f}, {meta['lat_range'][1]:.2f}]")
     print(f"        lon [{meta['lon_range'][0]:.2f}, {meta['lon_range'][1]:.2f}]")
 
-    # 3. Charger landmask (optionnel)
-    print("\n3) Chargement landmask...")
-    try:
-        landmask = LandMask("gshhs_land_water_mask_3km_i.tif", verbose=True)
-    except Exception as e:
-        print(f" Landmask non disponible, continuons sans ({e})")
-        landmask = None
-
-    # 4. Configuration route
-    print("\n4) Configuration route...")
+    # 3. Configuration route
+    print("\n3) Configuration route...")
     START = (46.5, -2.5)  # Large La Rochelle
     END = (43.8, -1.8)    # Large Biarritz
 
@@ -64,6 +56,17 @@ def main():
     print(f"  Arrivée: {END[0]:.2f}°N, {END[1]:.2f}°")
     print(f"  Date: {DEPARTURE.strftime('%d/%m/%Y %H:%M')}")
 
+    # 4. Charger landmask (optionnel), seulement autour de la zone de navigation
+    print("\n4) Chargement landmask...")
+    margin = 2.0  # degrés autour du départ / de l'arrivée
+    bbox = (min(START[0], END[0]) - margin, max(START[0], END[0]) + margin,
+            min(START[1], END[1]) - margin, max(START[1], END[1]) + margin)
+    try:
+        landmask = LandMask("gshhs_land_water_mask_3km_i.tif", verbose=True, bbox=bbox)
+    except Exception as e:
+        print(f" Landmask non disponible, continuons sans ({e})")
+        landmask = None
+
     # 5. Calcul route
     print("\n5) Calcul route avec A* (VMG + manœuvres + coût composite)...")
     route = calculate_route_astar_fixed(
@@ -86,11 +89,9 @@ def main():
         print(" ROUTE CALCULÉE !")
         print("=" * 70)
 
-        total_dist = sum(
-            haversine(route[i]["lat"], route[i]["lon"],
-                      route[i + 1]["lat"], route[i + 1]["lon"])
-            for i in range(len(route) - 1)
-        )
+        lats = np.fromiter((wp["lat"] for wp in route), dtype=np.float64, count=len(route))
+        lons = np.fromiter((wp["lon"] for wp in route), dtype=np.float64, count=len(route))
+        total_dist = float(haversine_vec(lats[:-1], lons[:-1], lats[1:], lons[1:]).sum())
 
         # Attention: g_cost est maintenant un "coût composite" (temps + pénalités),
         # pas uniquement le temps pur.
@@ -110,7 +111,7 @@ def main():
             print("\nCONDITIONS VENT:")
             print(f"  Min: {min(wind_speeds):.1f} kn")
             print(f"  Max: {max(wind_speeds):.1f} kn")
-            print(f"  Moyenne: {np.mean(wind_speeds):.1f} kn")
+            print(f"  Moyenne: {sum(wind_speeds) / len(wind_speeds):.1f} kn")
 
         # Manœuvres
         maneuvers = [wp.get("maneuver") for wp in route if wp.get("maneuver") in ("tack", "gybe")]
@@ -135,6 +136,9 @@ def main():
         print("\nAucune route trouvée")
         print("💡 Essayez d'augmenter max_iterations ou arrival_threshold, ou beam_width")
 
+    if landmask:
+        landmask.close()
+
 
 if __name__ == "__main__":
     main()
@@ -1,26 +1,62 @@
+import math
 import pygrib
 import numpy as np
 from dataclasses import dataclass
 from datetime import datetime
-from conventions import ms_to_knots, uv_to_wind_dir_from
+from typing import List
+from conventions import uv_to_wind_dir_from_vec, MPS_TO_KNOT, RAD2DEG
+from outils import njit
 
 
 @dataclass
-class GribWindField:
+class GribWindFields:
     """
-    Représente un champ (u10,v10) sur une grille lat/lon à une date.
+    Champs (u10, v10) de toutes les échéances d'un GRIB sur une grille commune.
+    lats / lons: grille 2D partagée (lue une seule fois).
+    lat_info / lon_info: axes 1D précalculés (cf. _axis_info).
+    times_sec: secondes depuis t0 (float64) pour une recherche binaire native.
+    uv_stack: (T, H, W) complex64 u + i·v en m/s, uv_stack[k] = échéance times[k]
+    (u et v d'une cellule côte à côte en mémoire; l'interpolation étant
+    linéaire, interpoler le complexe revient à interpoler u et v).
     """
-    valid_date: datetime
     lats: np.ndarray
     lons: np.ndarray
-    u10: np.ndarray  # m/s
-    v10: np.ndarray  # m/s
+    lat_info: dict
+    lon_info: dict
+    times: List[datetime]
+    t0: datetime
+    times_sec: np.ndarray
+    uv_stack: np.ndarray
+
+    def __len__(self):
+        return len(self.times)
+
+    @property
+    def u_stack(self):
+        """Composante u (vue float32 sur uv_stack, sans copie)."""
+        return self.uv_stack.real
+
+    @property
+    def v_stack(self):
+        """Composante v (vue float32 sur uv_stack, sans copie)."""
+        return self.uv_stack.imag
+
+
+def _grib_values(msg):
+    """
+    Valeurs décodées d'un message (un seul décodage par message).
+    Copie NaN seulement si pygrib renvoie un tableau masqué.
+    """
+    vals = msg.values
+    if np.ma.isMaskedArray(vals):
+        return vals.filled(np.nan)
+    return vals
 
 
 def load_grib_wind_fields(filepath, normalize_lons=True):
     """
     Charge toutes les échéances présentes dans un GRIB (u10/v10 à 10m).
-    Retourne une liste triée de GribWindField.
+    Retourne un GribWindFields (échéances triées) et des métadonnées.
     """
     fields_u = {}
     fields_v = {}
@@ -38,89 +74,109 @@ def load_grib_wind_fields(filepath, normalize_lons=True):
     if not common_times:
         raise ValueError("Aucune échéance commune U10/V10 trouvée dans le GRIB.")
 
-    fields = []
-    for t in common_times:
-        grb_u = fields_u[t]
-        grb_v = fields_v[t]
-        u10 = grb_u.values
-        v10 = grb_v.values
-        lats, lons = grb_u.latlons()
-
-        if normalize_lons:
-            lons = np.where(lons > 180, lons - 360, lons)
-
-        fields.append(GribWindField(
-            valid_date=grb_u.validDate,
-            lats=lats,
-            lons=lons,
-            u10=u10,
-            v10=v10
-        ))
+    # grille commune: lue une fois sur le premier message
+    lats, lons = fields_u[common_times[0]].latlons()
+    if normalize_lons:
+        if not lons.flags.writeable:
+            lons = lons.copy()
+        np.subtract(lons, 360.0, out=lons, where=lons > 180)  # en place, sans copie H×W
+
+    # axes remis en ordre croissant une fois pour toutes (grille + champs),
+    # le calcul de cellule n'a plus à gérer d'axe décroissant
+    flip = _ascending_flip(lats, lons)
+    lats = np.ascontiguousarray(lats[flip])
+    lons = np.ascontiguousarray(lons[flip])
+
+    # complex64 C-contigu (2 x float32): erreur relative ~6e-8, négligeable
+    # devant la précision d'un GRIB; u et v d'un noeud lus dans la même
+    # ligne de cache
+    T = len(common_times)
+    uv_stack = np.empty((T,) + lats.shape, dtype=np.complex64, order="C")
+    for k, t in enumerate(common_times):
+        uv_stack.real[k] = _grib_values(fields_u[t])[flip]
+        uv_stack.imag[k] = _grib_values(fields_v[t])[flip]
+
+    t0 = common_times[0]
+    grib = GribWindFields(
+        lats=lats,
+        lons=lons,
+        lat_info=_axis_info(lats[:, 0]),
+        lon_info=_axis_info(lons[0, :]),
+        times=list(common_times),
+        t0=t0,
+        times_sec=np.array([(t - t0).total_seconds() for t in common_times]),
+        uv_stack=uv_stack,
+    )
 
     meta = {
-        "n_times": len(fields),
-        "times": [f.valid_date for f in fields],
-        "shape": fields[0].u10.shape,
-        "lat_range": (float(fields[0].lats.min()), float(fields[0].lats.max())),
-        "lon_range": (float(fields[0].lons.min()), float(fields[0].lons.max())),
+        "n_times": T,
+        "times": list(common_times),
+        "shape": lats.shape,
+        "lat_range": (float(lats.min()), float(lats.max())),
+        "lon_range": (float(lons.min()), float(lons.max())),
     }
-    return fields, meta
+    return grib, meta
 
 
-def _find_bilinear_cell(lat_target, lon_target, lats, lons):
+def _ascending_flip(lats, lons):
     """
-    Trouve (i0,i1,j0,j1) pour interpolation bilinéaire.
-    Hypothèse: grille rectiligne type WRF, lats ~ monotone en i, lons ~ monotone en j.
+    Slices (lignes, colonnes) remettant les axes d'une grille 2D en ordre
+    croissant (à appliquer à la grille et à chaque champ).
     """
-    lat_1d = lats[:, 0]
-    lon_1d = lons[0, :]
+    return (slice(None, None, -1 if lats[-1, 0] < lats[0, 0] else 1),
+            slice(None, None, -1 if lons[0, -1] < lons[0, 0] else 1))
 
-    # on gère le cas lat décroissante
-    if lat_1d[1] < lat_1d[0]:
-        lat_1d = lat_1d[::-1]
-        lat_flip = True
-    else:
-        lat_flip = False
-
-    # lon croissante en général après normalisation
-    if lon_1d[1] < lon_1d[0]:
-        lon_1d = lon_1d[::-1]
-        lon_flip = True
-    else:
-        lon_flip = False
 
-    if lat_target < lat_1d.min() or lat_target > lat_1d.max():
-        return None
-    if lon_target < lon_1d.min() or lon_target > lon_1d.max():
-        return None
+def _axis_info(axis_1d):
+    """
+    Paramètres d'un axe croissant (remis dans cet ordre au chargement):
+    (a0, da) si l'axe est régulier (pas constant), pour un calcul d'indice
+    analytique sans recherche.
+    """
+    steps = np.diff(axis_1d)
+    regular = bool(np.allclose(steps, steps[0], rtol=1e-6, atol=1e-9))
+    return {
+        "axis": axis_1d,
+        "n": len(axis_1d),
+        "regular": regular,
+        "a0": float(axis_1d[0]),
+        "da": float(steps[0]),
+        "min": float(axis_1d[0]),
+        "max": float(axis_1d[-1]),
+    }
 
-    i1 = int(np.searchsorted(lat_1d, lat_target))
-    j1 = int(np.searchsorted(lon_1d, lon_target))
 
-    i0 = max(i1 - 1, 0)
-    j0 = max(j1 - 1, 0)
-    i1 = min(i1, len(lat_1d) - 1)
-    j1 = min(j1, len(lon_1d) - 1)
+def _axis_index(info, x):
+    """Indice i0 de la cellule [i0, i0+1] contenant x (O(1) si axe régulier)."""
+    if info["regular"]:
+        i = int((x - info["a0"]) / info["da"])
+    else:
+        i = int(np.searchsorted(info["axis"], x)) - 1
+    return min(max(i, 0), info["n"] - 2)
 
-    # remettre indices dans la grille originale si flip
-    if lat_flip:
-        i0o = (lats.shape[0] - 1) - i0
-        i1o = (lats.shape[0] - 1) - i1
-        i0, i1 = min(i0o, i1o), max(i0o, i1o)
 
-    if lon_flip:
-        j0o = (lons.shape[1] - 1) - j0
-        j1o = (lons.shape[1] - 1) - j1
-        j0, j1 = min(j0o, j1o), max(j0o, j1o)
+def _find_bilinear_cell(lat_target, lon_target, lats, lons, lat_info, lon_info):
+    """
+    Trouve (i0,i1,j0,j1) pour interpolation bilinéaire.
+    Hypothèse: grille rectiligne type WRF, axes croissants (cf. load_grib_wind_fields).
+    lat_info / lon_info: axes précalculés (GribWindFields).
+    """
+    if lat_target < lat_info["min"] or lat_target > lat_info["max"]:
+        return None
+    if lon_target < lon_info["min"] or lon_target > lon_info["max"]:
+        return None
 
-    return i0, i1, j0, j1
+    i0 = _axis_index(lat_info, lat_target)
+    j0 = _axis_index(lon_info, lon_target)
+    return i0, i0 + 1, j0, j0 + 1
 
 
-def _bilinear(lat_target, lon_target, lats, lons, field_2d):
+def _bilinear_weights(lat_target, lon_target, lats, lons, lat_info, lon_info):
     """
-    Interpolation bilinéaire sur une grille lat/lon rectiligne (approx).
+    Cellule (i0,i1,j0,j1) + poids (tx, ty) pour l'interpolation bilinéaire.
+    Returns None hors grille. Les poids sont communs à u et v.
     """
-    cell = _find_bilinear_cell(lat_target, lon_target, lats, lons)
+    cell = _find_bilinear_cell(lat_target, lon_target, lats, lons, lat_info, lon_info)
     if cell is None:
         return None
 
@@ -132,9 +188,6 @@ def _bilinear(lat_target, lon_target, lats, lons, field_2d):
     lon1 = float(lons[0, j1])
 
     # gérer cellules dégénérées
-    if abs(lat1 - lat0) < 1e-12 and abs(lon1 - lon0) < 1e-12:
-        return float(field_2d[i0, j0])
-
     if abs(lat1 - lat0) < 1e-12:
         ty = 0.0
     else:
@@ -147,64 +200,159 @@ def _bilinear(lat_target, lon_target, lats, lons, field_2d):
 
     ty = max(0.0, min(1.0, ty))
     tx = max(0.0, min(1.0, tx))
+    return i0, i1, j0, j1, tx, ty
 
-    f00 = field_2d[i0, j0]
-    f01 = field_2d[i0, j1]
-    f10 = field_2d[i1, j0]
-    f11 = field_2d[i1, j1]
-
-    val = (f00 * (1 - tx) * (1 - ty) +
-           f01 * tx * (1 - ty) +
-           f10 * (1 - tx) * ty +
-           f11 * tx * ty)
-    return float(val)
-
-
-def wind_uv_at(fields, lat, lon, timestamp: datetime):
-    """
-    Renvoie (u_ms, v_ms) interpolé bilinéairement + linéairement dans le temps.
-    """
-    times = [f.valid_date for f in fields]
-    if timestamp <= times[0]:
-        f0 = fields[0]
-        u = _bilinear(lat, lon, f0.lats, f0.lons, f0.u10)
-        v = _bilinear(lat, lon, f0.lats, f0.lons, f0.v10)
-        if u is None or v is None:
-            return None
-        return u, v
-
-    if timestamp >= times[-1]:
-        f1 = fields[-1]
-        u = _bilinear(lat, lon, f1.lats, f1.lons, f1.u10)
-        v = _bilinear(lat, lon, f1.lats, f1.lons, f1.v10)
-        if u is None or v is None:
-            return None
-        return u, v
-
-    # encadrer
-    k1 = int(np.searchsorted(times, timestamp))
-    k0 = k1 - 1
-    f0 = fields[k0]
-    f1 = fields[k1]
 
-    u0 = _bilinear(lat, lon, f0.lats, f0.lons, f0.u10)
-    v0 = _bilinear(lat, lon, f0.lats, f0.lons, f0.v10)
-    u1 = _bilinear(lat, lon, f1.lats, f1.lons, f1.u10)
-    v1 = _bilinear(lat, lon, f1.lats, f1.lons, f1.v10)
+# pas de fastmath: les NaN (valeurs GRIB masquées) doivent se propager
+@njit(cache=True)
+def _wind_fused(uv_stack, i0, i1, j0, j1, tx, ty, k0, k1, alpha):
+    """
+    Bilinéaire spatial + linéaire temporel sur u + i·v en une passe,
+    puis conversion directe en (vitesse nœuds, direction FROM degrés).
+    """
+    w00 = (1.0 - tx) * (1.0 - ty)
+    w01 = tx * (1.0 - ty)
+    w10 = (1.0 - tx) * ty
+    w11 = tx * ty
+
+    z0 = (uv_stack[k0, i0, j0] * w00 + uv_stack[k0, i0, j1] * w01 +
+          uv_stack[k0, i1, j0] * w10 + uv_stack[k0, i1, j1] * w11)
+    z1 = (uv_stack[k1, i0, j0] * w00 + uv_stack[k1, i0, j1] * w01 +
+          uv_stack[k1, i1, j0] * w10 + uv_stack[k1, i1, j1] * w11)
+    z = (1.0 - alpha) * z0 + alpha * z1
+
+    u = z.real
+    v = z.imag
+    speed_kn = math.sqrt(u * u + v * v) * MPS_TO_KNOT
+    dir_from = (270.0 - math.atan2(v, u) * RAD2DEG) % 360.0
+    return speed_kn, dir_from
+
+
+def _axis_index_vec(info, x):
+    """Version vectorisée de _axis_index."""
+    if info["regular"]:
+        i = np.floor((x - info["a0"]) / info["da"]).astype(np.intp)
+    else:
+        i = np.searchsorted(info["axis"], x) - 1
+    return np.clip(i, 0, info["n"] - 2)
 
-    if u0 is None or v0 is None or u1 is None or v1 is None:
-        return None
 
-    dt = (f1.valid_date - f0.valid_date).total_seconds()
-    if dt <= 0:
+def _frac(num, den):
+    """num/den borné à [0, 1], 0 pour les cellules dégénérées (den ~ 0)."""
+    t = np.zeros(np.shape(num))
+    np.divide(num, den, out=t, where=np.abs(den) >= 1e-12)
+    return np.clip(t, 0.0, 1.0)
+
+
+def _bilinear_cells_vec(lat_t, lon_t, lats, lons, lat_info, lon_info):
+    """
+    Version vectorisée de _find_bilinear_cell + poids bilinéaires.
+    Returns: (inside, i0, i1, j0, j1, tx, ty), inside=False hors grille.
+    """
+    inside = ((lat_t >= lat_info["min"]) & (lat_t <= lat_info["max"]) &
+              (lon_t >= lon_info["min"]) & (lon_t <= lon_info["max"]))
+
+    i0 = _axis_index_vec(lat_info, lat_t)
+    j0 = _axis_index_vec(lon_info, lon_t)
+    i1 = i0 + 1
+    j1 = j0 + 1
+
+    lat0 = lats[i0, 0]
+    lon0 = lons[0, j0]
+    ty = _frac(lat_t - lat0, lats[i1, 0] - lat0)
+    tx = _frac(lon_t - lon0, lons[0, j1] - lon0)
+    return inside, i0, i1, j0, j1, tx, ty
+
+
+def _bilinear_vec(cells, field_2d):
+    """Interpolation bilinéaire vectorisée (NaN hors grille, NaN+NaN·i si complexe)."""
+    inside, i0, i1, j0, j1, tx, ty = cells
+    val = (field_2d[i0, j0] * (1 - tx) * (1 - ty) +
+           field_2d[i0, j1] * tx * (1 - ty) +
+           field_2d[i1, j0] * (1 - tx) * ty +
+           field_2d[i1, j1] * tx * ty)
+    fill = complex(np.nan, np.nan) if np.iscomplexobj(val) else np.nan
+    return np.where(inside, val, fill)
+
+
+@njit(cache=True)
+def _wind_regular_nb(lat, lon, q, lat0, dlat, nlat, lat_max, lon0, dlon, nlon, lon_max,
+                     times_sec, uv_stack):
+    """
+    Recherche du vent entièrement compilée pour une grille régulière:
+    cellule O(1) + encadrement temporel + noyau fusionné.
+    Arguments "à plat" (numba ne compile pas les dataclasses): q en secondes
+    depuis t0, axes décrits par (origine, pas, taille, dernier noeud).
+    Returns: (speed_kn, dir_from, inside)
+    """
+    # test d'appartenance sur les coordonnées (comme _find_bilinear_cell):
+    # (max - a0) / da peut dépasser n - 1 d'un arrondi sur le bord exact
+    if lat < lat0 or lat > lat_max or lon < lon0 or lon > lon_max:
+        return 0.0, 0.0, False
+    fi = (lat - lat0) / dlat
+    fj = (lon - lon0) / dlon
+
+    i0 = min(int(fi), nlat - 2)
+    j0 = min(int(fj), nlon - 2)
+    ty = min(max(fi - i0, 0.0), 1.0)
+    tx = min(max(fj - j0, 0.0), 1.0)
+
+    last = len(times_sec) - 1
+    if q <= times_sec[0]:
+        k0 = 0
+        k1 = 0
+        alpha = 0.0
+    elif q >= times_sec[last]:
+        k0 = last
+        k1 = last
         alpha = 0.0
     else:
-        alpha = (timestamp - f0.valid_date).total_seconds() / dt
+        k1 = np.searchsorted(times_sec, q)
+        k0 = k1 - 1
+        dt = times_sec[k1] - times_sec[k0]
+        alpha = 0.0 if dt <= 0.0 else min(max((q - times_sec[k0]) / dt, 0.0), 1.0)
+
+    speed_kn, dir_from = _wind_fused(uv_stack, i0, i0 + 1, j0, j0 + 1,
+                                     tx, ty, k0, k1, alpha)
+    return speed_kn, dir_from, True
+
+
+def _time_bracket(fields, q):
+    """
+    (k0, k1, alpha) encadrant q (secondes depuis fields.t0), via recherche
+    binaire sur times_sec.
+    Hors plage: clamp sur la première/dernière échéance (k0 == k1).
+    """
+    ts = fields.times_sec
+    if q <= ts[0]:
+        return 0, 0, 0.0
+    if q >= ts[-1]:
+        last = len(ts) - 1
+        return last, last, 0.0
+
+    k1 = int(np.searchsorted(ts, q))
+    k0 = k1 - 1
+    dt = ts[k1] - ts[k0]
+    alpha = 0.0 if dt <= 0 else (q - ts[k0]) / dt
+    return k0, k1, max(0.0, min(1.0, alpha))
+
+
+def _wind_uv_batch_sec(fields, lats, lons, q):
+    """
+    (u, v) interpolés pour plusieurs points (lats, lons) au même instant q
+    (secondes depuis fields.t0, cas d'une expansion A*). NaN hors grille.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
 
-    alpha = max(0.0, min(1.0, alpha))
-    u = (1 - alpha) * u0 + alpha * u1
-    v = (1 - alpha) * v0 + alpha * v1
-    return float(u), float(v)
+    k0, k1, alpha = _time_bracket(fields, q)
+    # grille commune: une seule localisation pour les deux échéances
+    cells = _bilinear_cells_vec(lats, lons, fields.lats, fields.lons,
+                                fields.lat_info, fields.lon_info)
+    z = _bilinear_vec(cells, fields.uv_stack[k0])
+    if k0 != k1:
+        z = (1 - alpha) * z + alpha * _bilinear_vec(cells, fields.uv_stack[k1])
+    return z.real, z.imag
 
 
 def get_wind_from_grib(lat, lon, timestamp, grib_fields):
@@ -215,11 +363,52 @@ def get_wind_from_grib(lat, lon, timestamp, grib_fields):
     Returns:
         wind_speed_kn, wind_dir_from_deg
     """
-    uv = wind_uv_at(grib_fields, lat, lon, timestamp)
-    if uv is None:
+    q = (timestamp - grib_fields.t0).total_seconds()
+    return get_wind_from_grib_sec(lat, lon, q, grib_fields)
+
+
+def get_wind_from_grib_sec(lat, lon, q, grib_fields):
+    """
+    Comme get_wind_from_grib, avec le temps q en secondes depuis grib_fields.t0
+    (pas d'arithmétique datetime dans la boucle du routeur).
+    Grille régulière: un seul appel compilé (_wind_regular_nb).
+    Sinon: cellule et poids calculés une fois, puis noyau fusionné (_wind_fused).
+    Lève ValueError hors grille ou si la cellule touche une valeur masquée.
+    Returns:
+        wind_speed_kn, wind_dir_from_deg
+    """
+    lat_info, lon_info = grib_fields.lat_info, grib_fields.lon_info
+    if lat_info["regular"] and lon_info["regular"]:
+        speed_kn, direction_from, inside = _wind_regular_nb(
+            float(lat), float(lon), float(q),
+            lat_info["a0"], lat_info["da"], lat_info["n"], lat_info["max"],
+            lon_info["a0"], lon_info["da"], lon_info["n"], lon_info["max"],
+            grib_fields.times_sec, grib_fields.uv_stack)
+        if not inside:
+            raise ValueError("Point hors grille GRIB (spatial) ou données invalides.")
+    else:
+        w = _bilinear_weights(lat, lon, grib_fields.lats, grib_fields.lons,
+                              grib_fields.lat_info, grib_fields.lon_info)
+        if w is None:
+            raise ValueError("Point hors grille GRIB (spatial) ou données invalides.")
+        k0, k1, alpha = _time_bracket(grib_fields, q)
+        i0, i1, j0, j1, tx, ty = w
+        speed_kn, direction_from = _wind_fused(grib_fields.uv_stack,
+                                               i0, i1, j0, j1, tx, ty, k0, k1, alpha)
+
+    # cellule touchant une valeur masquée (NaN au chargement)
+    if not (math.isfinite(speed_kn) and math.isfinite(direction_from)):
         raise ValueError("Point hors grille GRIB (spatial) ou données invalides.")
-    u, v = uv
-    speed_ms = float(np.hypot(u, v))
-    speed_kn = ms_to_knots(speed_ms)
-    direction_from = uv_to_wind_dir_from(u, v)
-    return speed_kn, direction_from
+    return float(speed_kn), float(direction_from)
+
+
+def get_wind_from_grib_batch_sec(lats, lons, q, grib_fields):
+    """
+    Version vectorisée de get_wind_from_grib_sec (même instant q, en secondes
+    depuis grib_fields.t0, pour tous les points).
+    Returns:
+        wind_speed_kn[], wind_dir_from_deg[] (NaN là où get_wind_from_grib_sec
+        lève ValueError: hors grille ou cellule masquée)
+    """
+    u, v = _wind_uv_batch_sec(grib_fields, lats, lons, q)
+    return np.hypot(u, v) * MPS_TO_KNOT, uv_to_wind_dir_from_vec(u, v)
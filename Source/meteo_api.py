@@ -1,14 +1,16 @@
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from functools import lru_cache
 import math
+import numpy as np
+from conventions import MPS_TO_KNOT, KNOT_TO_MPS
 
 # -----------------------------
 # Utils
 # -----------------------------
 
 def kmh_to_knots(kmh: float) -> float:
-    return kmh * 0.539957
+    return kmh / 3.6 * MPS_TO_KNOT
 
 
 def wind_dir_to_uv(speed_kn: float, direction_from_deg: float):
@@ -16,7 +18,7 @@ def wind_dir_to_uv(speed_kn: float, direction_from_deg: float):
     Convertit (vitesse, direction FROM) -> (u, v)
     Convention météo (direction FROM).
     """
-    speed_ms = speed_kn / 1.94384
+    speed_ms = speed_kn * KNOT_TO_MPS
     theta = math.radians(direction_from_deg)
     u = -speed_ms * math.sin(theta)
     v = -speed_ms * math.cos(theta)
@@ -30,14 +32,24 @@ def wind_dir_to_uv(speed_kn: float, direction_from_deg: float):
 class OpenMeteoClient:
     """
     Client météo Open-Meteo avec cache.
+    Les séries horaires sont récupérées par lots (plusieurs points par requête)
+    puis servies depuis la mémoire.
     """
 
-    def __init__(self, cache_round=2):
+    URL = "https://api.open-meteo.com/v1/forecast"
+    MAX_LOCATIONS = 1000  # limite Open-Meteo par requête
+
+    def __init__(self, cache_round=2, max_workers=4):
         """
         cache_round:
             arrondi lat/lon (2 = ~1 km, 1 = ~10 km)
+        max_workers:
+            requêtes HTTP simultanées lors d'un prefetch
         """
         self.cache_round = cache_round
+        self.max_workers = max_workers
+        # (lat_r, lon_r) -> {"times_idx": {ts_str: idx}, "speeds": array, "dirs": array}
+        self._stations = {}
 
     def _round_key(self, lat, lon, timestamp):
         return (
@@ -46,18 +58,70 @@ class OpenMeteoClient:
             timestamp.replace(minute=0, second=0, microsecond=0)
         )
 
-    @lru_cache(maxsize=10_000)
-    def _fetch_hourly(self, lat, lon):
-        url = "https://api.open-meteo.com/v1/forecast"
+    def _fetch_batch(self, lat_list, lon_list):
+        """
+        Une seule requête pour plusieurs points (coordonnées séparées par des virgules).
+        Retourne une liste de dicts "station" dans l'ordre des points.
+        """
         params = {
-            "latitude": lat,
-            "longitude": lon,
+            "latitude": ",".join(str(x) for x in lat_list),
+            "longitude": ",".join(str(x) for x in lon_list),
             "hourly": "wind_speed_10m,wind_direction_10m",
             "timezone": "UTC"
         }
-        r = requests.get(url, params=params, timeout=10)
+        r = requests.get(self.URL, params=params, timeout=10)
         r.raise_for_status()
-        return r.json()
+        data = r.json()
+        if isinstance(data, dict):  # un seul point -> objet, sinon liste
+            data = [data]
+        # les stations sont associées aux points par position: un décompte
+        # différent décalerait ou perdrait des points
+        if len(data) != len(lat_list):
+            raise ValueError(
+                f"Réponse Open-Meteo incomplète: {len(data)} stations pour {len(lat_list)} points demandés"
+            )
+
+        stations = []
+        for d in data:
+            hourly = d["hourly"]
+            stations.append({
+                "times_idx": {t: i for i, t in enumerate(hourly["time"])},
+                "speeds": np.asarray(hourly["wind_speed_10m"], dtype=float),
+                "dirs": np.asarray(hourly["wind_direction_10m"], dtype=float),
+            })
+        return stations
+
+    def prefetch(self, points):
+        """
+        Charge en une ou quelques requêtes toutes les stations manquantes.
+        points: itérable de (lat, lon).
+        """
+        pending = []
+        seen = set()
+        for lat, lon in points:
+            key = (round(lat, self.cache_round), round(lon, self.cache_round))
+            if key not in self._stations and key not in seen:
+                seen.add(key)
+                pending.append(key)
+
+        chunks = [pending[k:k + self.MAX_LOCATIONS]
+                  for k in range(0, len(pending), self.MAX_LOCATIONS)]
+        if not chunks:
+            return
+
+        def fetch(chunk):
+            return self._fetch_batch([p[0] for p in chunk], [p[1] for p in chunk])
+
+        # latence réseau dominante: les lots partent en parallèle
+        if len(chunks) == 1:
+            results = [fetch(chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as pool:
+                results = list(pool.map(fetch, chunks))
+
+        for chunk, stations in zip(chunks, results):
+            for key, st in zip(chunk, stations):
+                self._stations[key] = st
 
     def get_wind(self, lat, lon, timestamp: datetime):
         """
@@ -70,23 +134,23 @@ class OpenMeteoClient:
         key = self._round_key(lat, lon, timestamp)
 
         lat_r, lon_r, ts_r = key
-        data = self._fetch_hourly(lat_r, lon_r)
-
-        times = data["hourly"]["time"]
-        speeds = data["hourly"]["wind_speed_10m"]
-        dirs = data["hourly"]["wind_direction_10m"]
+        st = self._stations.get((lat_r, lon_r))
+        if st is None:
+            self.prefetch([(lat_r, lon_r)])
+            st = self._stations.get((lat_r, lon_r))
+            if st is None:
+                raise ValueError(f"Station Open-Meteo absente pour ({lat_r}, {lon_r})")
 
         # Trouver index horaire
         ts_str = ts_r.strftime("%Y-%m-%dT%H:00")
-        try:
-            idx = times.index(ts_str)
-        except ValueError:
+        idx = st["times_idx"].get(ts_str)
+        if idx is None:
             raise ValueError("Timestamp hors plage Open-Meteo")
 
-        speed_kmh = speeds[idx]
-        dir_from = dirs[idx]
+        speed_kmh = st["speeds"][idx]
+        dir_from = st["dirs"][idx]
 
-        return kmh_to_knots(speed_kmh), float(dir_from)
+        return kmh_to_knots(float(speed_kmh)), float(dir_from)
 
     def get_wind_uv(self, lat, lon, timestamp):
         speed_kn, dir_from = self.get_wind(lat, lon, timestamp)
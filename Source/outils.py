@@ -1,43 +1,68 @@
 import math
-from conventions import deg2rad, rad2deg, wrap_360
+import numpy as np
 
-EARTH_RADIUS_M = 6371000.0
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:  # numba optionnel: on retombe sur du Python pur
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """Décorateur neutre quand numba n'est pas installé."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
 
+EARTH_RADIUS_M = 6371000.0
+_D2R = math.pi / 180.0
+_R2D = 180.0 / math.pi
 
+@njit(cache=True, fastmath=True)
 def haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
     Calcule la distance orthodromique en mètres.
     Args: lat/lon en degrés décimaux
     Returns: distance en mètres
     """
-    phi1 = deg2rad(lat1)
-    phi2 = deg2rad(lat2)
-    delta_phi = deg2rad(lat2 - lat1)
-    delta_lambda = deg2rad(lon2 - lon1)
+    phi1 = lat1 * _D2R
+    phi2 = lat2 * _D2R
+    delta_phi = (lat2 - lat1) * _D2R
+    delta_lambda = (lon2 - lon1) * _D2R
 
     a = (math.sin(delta_phi / 2.0) ** 2 +
          math.cos(phi1) * math.cos(phi2) *
          math.sin(delta_lambda / 2.0) ** 2)
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return EARTH_RADIUS_M * c
+    # 2*asin(sqrt(a)) (a borné contre les arrondis): une racine et un asin
+    return 2.0 * EARTH_RADIUS_M * math.asin(math.sqrt(min(a, 1.0)))
 
 
-def bearing(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+@njit(cache=True, fastmath=True)
+def bearing_rad(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
-    Calcule le cap initial (en degrés) de point 1 vers point 2.
-    Convention: 0°=Nord, sens horaire.
+    Cap initial de point 1 vers point 2 en radians, dans (-pi, pi]
+    (0=Nord, sens horaire), sans conversion ni modulo.
     """
-    phi1 = deg2rad(lat1)
-    phi2 = deg2rad(lat2)
-    delta_lambda = deg2rad(lon2 - lon1)
+    phi1 = lat1 * _D2R
+    phi2 = lat2 * _D2R
+    delta_lambda = (lon2 - lon1) * _D2R
 
     y = math.sin(delta_lambda) * math.cos(phi2)
     x = (math.cos(phi1) * math.sin(phi2) -
          math.sin(phi1) * math.cos(phi2) * math.cos(delta_lambda))
-    theta = math.atan2(y, x)
-    return wrap_360(rad2deg(theta))
+    return math.atan2(y, x)
+
+
+@njit(cache=True, fastmath=True)
+def bearing(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Calcule le cap initial (en degrés) de point 1 vers point 2.
+    Convention: 0°=Nord, sens horaire.
+    """
+    deg = bearing_rad(lat1, lon1, lat2, lon2) * _R2D
+    return deg - 360.0 * math.floor(deg * (1.0 / 360.0))
 
 
+@njit(cache=True, fastmath=True)
 def destination_point(lat: float, lon: float, bearing_deg: float, distance_m: float) -> tuple[float, float]:
     """
     Calcule le point d'arrivée après avoir parcouru une distance sur un cap.
@@ -48,14 +73,155 @@ def destination_point(lat: float, lon: float, bearing_deg: float, distance_m: fl
     Returns: (lat, lon) destination
     """
     d = distance_m / EARTH_RADIUS_M
-    brng = deg2rad(bearing_deg)
+    brng = bearing_deg * _D2R
+    lat1 = lat * _D2R
+    lon1 = lon * _D2R
+
+    sin_d = math.sin(d)
+    cos_d = math.cos(d)
+    sin_b = math.sin(brng)
+    cos_b = math.cos(brng)
+    sin_lat1 = math.sin(lat1)
+    cos_lat1 = math.cos(lat1)
+
+    # sin(lat2) = argument de l'asin: pas de sin supplémentaire
+    sin_lat2 = min(1.0, max(-1.0, sin_lat1 * cos_d + cos_lat1 * sin_d * cos_b))
+    lat2 = math.asin(sin_lat2)
+    lon2 = lon1 + math.atan2(sin_b * sin_d * cos_lat1, cos_d - sin_lat1 * sin_lat2)
+
+    return (lat2 * _R2D, lon2 * _R2D)
+
+
+# table sin/cos des caps au 1/10 de degré (caps quantifiés du routeur, lus par geo_step)
+HDG_STEPS = 3600
+HDG_RES_DEG = 360.0 / HDG_STEPS
+_SIN_HDG = np.sin(np.arange(HDG_STEPS) * (HDG_RES_DEG * _D2R))
+_COS_HDG = np.cos(np.arange(HDG_STEPS) * (HDG_RES_DEG * _D2R))
+
+
+@njit(cache=True, fastmath=True)
+def _geo_step_one(sin_lat1, cos_lat1, lon1, hdg_idx, distance_m,
+                  goal_phi, cos_goal, goal_lon):
+    """
+    Un successeur de geo_step (angles en radians, trig de l'origine et du but
+    déjà calculés): destination sur le cap tabulé puis distance au but.
+    """
+    d = distance_m / EARTH_RADIUS_M
+    sin_d, cos_d = math.sin(d), math.cos(d)
+    sin_b = _SIN_HDG[hdg_idx]
+    cos_b = _COS_HDG[hdg_idx]
+
+    sin_lat2 = min(1.0, max(-1.0, sin_lat1 * cos_d + cos_lat1 * sin_d * cos_b))
+    lat2 = math.asin(sin_lat2)
+    lon2 = lon1 + math.atan2(sin_b * sin_d * cos_lat1, cos_d - sin_lat1 * sin_lat2)
+
+    # haversine vers le but: cos(lat2) >= 0 déduit de sin(lat2)
+    cos_lat2 = math.sqrt(1.0 - sin_lat2 * sin_lat2)
+    sin_dphi = math.sin((goal_phi - lat2) * 0.5)
+    sin_dlmb = math.sin((goal_lon - lon2) * 0.5)
+    a = sin_dphi ** 2 + cos_lat2 * cos_goal * sin_dlmb ** 2
+    dist = 2.0 * EARTH_RADIUS_M * math.asin(math.sqrt(min(a, 1.0)))
+    return lat2 * _R2D, lon2 * _R2D, dist
+
+
+@njit(cache=True, fastmath=True)
+def geo_step(lat, lon, hdg_idx, distances_m, goal_lat, goal_lon,
+             out_lat, out_lon, out_dist):
+    """
+    Successeurs d'un point en une passe compilée: destination pour chaque cap
+    de la grille (hdg_idx * HDG_RES_DEG, distance distances_m[k]) et distance
+    restante (m) jusqu'au but, écrites dans out_*. La trigo de l'origine et
+    du but est calculée une seule fois pour tout l'éventail.
+    """
+    phi1 = lat * _D2R
+    sin_lat1, cos_lat1 = math.sin(phi1), math.cos(phi1)
+    lon1 = lon * _D2R
+    goal_phi = goal_lat * _D2R
+    goal_lam = goal_lon * _D2R
+    cos_goal = math.cos(goal_phi)
+    for k in range(hdg_idx.shape[0]):
+        out_lat[k], out_lon[k], out_dist[k] = _geo_step_one(
+            sin_lat1, cos_lat1, lon1, hdg_idx[k], distances_m[k],
+            goal_phi, cos_goal, goal_lam)
+
+
+def check_coords(lats, lons):
+    """
+    Vérifie en une passe vectorisée que lat ∈ [-90, 90] et lon ∈ [-180, 180]
+    (NaN refusés). Lève ValueError sinon.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    ok = (np.abs(lats) <= 90.0).all() & (np.abs(lons) <= 180.0).all()
+    if not ok:
+        raise ValueError(f"Coordonnées hors limites: lat={lats}, lon={lons}")
+
+
+def haversine_vec(lat1, lon1, lat2, lon2):
+    """
+    Version vectorisée de haversine (tableaux NumPy, broadcasting).
+    Returns: distances en mètres
+    """
+    phi1 = np.asarray(lat1, dtype=np.float64) * _D2R
+    phi2 = np.asarray(lat2, dtype=np.float64) * _D2R
+    delta_phi = phi2 - phi1
+    delta_lambda = (np.asarray(lon2, dtype=np.float64) - lon1) * _D2R
+
+    a = (np.sin(delta_phi * 0.5) ** 2 +
+         np.cos(phi1) * np.cos(phi2) *
+         np.sin(delta_lambda * 0.5) ** 2)
+    # 2*asin(sqrt(a)): une seule fonction trigo inverse (a borné contre les arrondis)
+    return 2.0 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def bearing_vec(lat1, lon1, lat2, lon2):
+    """
+    Version vectorisée de bearing (tableaux NumPy, broadcasting).
+    Returns: caps initiaux en degrés [0, 360)
+    """
+    phi1 = np.asarray(lat1, dtype=np.float64) * _D2R
+    phi2 = np.asarray(lat2, dtype=np.float64) * _D2R
+    delta_lambda = (np.asarray(lon2, dtype=np.float64) - lon1) * _D2R
+
+    cos_phi2 = np.cos(phi2)
+    y = np.sin(delta_lambda) * cos_phi2
+    x = (np.cos(phi1) * np.sin(phi2) -
+         np.sin(phi1) * cos_phi2 * np.cos(delta_lambda))
+    deg = np.arctan2(y, x)
+    deg *= _R2D
+    # ramené dans [0, 360) sans branche
+    deg -= 360.0 * np.floor(deg * (1.0 / 360.0))
+    return deg
+
+
+def destination_point_vec(lat, lon, bearing_deg, distance_m):
+    """
+    Version vectorisée de destination_point (tableaux NumPy, broadcasting).
+    Returns: (lats, lons) destinations
+    """
+    d = np.asarray(distance_m, dtype=np.float64) / EARTH_RADIUS_M
+    brng = np.asarray(bearing_deg, dtype=np.float64) * _D2R
+
+    if np.ndim(lat) == 0 and np.ndim(lon) == 0:
+        # origine commune (expansion d'un nœud): trig de départ en scalaire, une fois
+        lat1 = float(lat) * _D2R
+        lon1 = float(lon) * _D2R
+        sin_lat1 = math.sin(lat1)
+        cos_lat1 = math.cos(lat1)
+    else:
+        lat1 = np.asarray(lat, dtype=np.float64) * _D2R
+        lon1 = np.asarray(lon, dtype=np.float64) * _D2R
+        sin_lat1 = np.sin(lat1)
+        cos_lat1 = np.cos(lat1)
 
-    lat1 = deg2rad(lat)
-    lon1 = deg2rad(lon)
+    sin_d = np.sin(d)
+    cos_d = np.cos(d)
 
-    lat2 = math.asin(math.sin(lat1) * math.cos(d) +
-                     math.cos(lat1) * math.sin(d) * math.cos(brng))
-    lon2 = lon1 + math.atan2(math.sin(brng) * math.sin(d) * math.cos(lat1),
-                             math.cos(d) - math.sin(lat1) * math.sin(lat2))
+    # trig des caps: une passe NumPy sur tout l'éventail; sin(lat2) est
+    # l'argument de l'arcsin (pas de np.sin supplémentaire)
+    sin_lat2 = np.clip(sin_lat1 * cos_d + cos_lat1 * sin_d * np.cos(brng), -1.0, 1.0)
+    lat2 = np.arcsin(sin_lat2)
+    lon2 = lon1 + np.arctan2(np.sin(brng) * sin_d * cos_lat1,
+                             cos_d - sin_lat1 * sin_lat2)
 
-    return (rad2deg(lat2), rad2deg(lon2))
+    return lat2 * _R2D, lon2 * _R2D
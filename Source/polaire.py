@@ -1,119 +1,238 @@
-import numpy as np
-import csv
-import pandas as pd
-from conventions import clamp
-
-
-def save_polar_to_csv(file_path_in, file_path_out):
-    """Lit un fichier polaire TSV et l'enregistre en CSV."""
-    with open(file_path_in, 'r') as f:
-        lines = [line.strip() for line in f if line.strip()]
-
-    with open(file_path_out, 'w', newline='') as csvfile:
-        writer = csv.writer(csvfile)
-        for line in lines:
-            row = line.split("\t")
-            writer.writerow(row)
-
-    print(f"Fichier CSV créé : {file_path_out}")
-
-
-def load_polar_diagram(csv_path):
-    """
-    Charge polaires depuis CSV.
-    Returns: (twa_array, tws_array, speed_matrix)
-    """
-    df = pd.read_csv(csv_path)
-    twa_array = df.iloc[:, 0].to_numpy()
-    tws_array = df.columns[1:].astype(float).to_numpy()
-    speed_matrix = df.iloc[:, 1:].to_numpy()
-
-    print(f"✓ Polaires chargées: {len(twa_array)} TWA × {len(tws_array)} TWS")
-    return twa_array, tws_array, speed_matrix
-
-
-def get_boat_speed(twa, tws, twa_array, tws_array, speed_matrix):
-    """
-    Vitesse bateau interpolée depuis polaires.
-    Args:
-        twa: True Wind Angle (degrés)
-        tws: True Wind Speed (nœuds)
-    Returns: Vitesse bateau (nœuds)
-    """
-    twa = abs(twa) % 360
-    if twa > 180:
-        twa = 360 - twa
-
-    twa = clamp(twa, float(twa_array.min()), float(twa_array.max()))
-    tws = clamp(tws, float(tws_array.min()), float(tws_array.max()))
-
-    i = np.searchsorted(twa_array, twa)
-    j = np.searchsorted(tws_array, tws)
-
-    i_low = max(i - 1, 0)
-    i_high = min(i, len(twa_array) - 1)
-    j_low = max(j - 1, 0)
-    j_high = min(j, len(tws_array) - 1)
-
-    v_ll = speed_matrix[i_low, j_low]
-    v_lh = speed_matrix[i_low, j_high]
-    v_hl = speed_matrix[i_high, j_low]
-    v_hh = speed_matrix[i_high, j_high]
-
-    if tws_array[j_high] == tws_array[j_low]:
-        tx = 0.0
-    else:
-        tx = (tws - tws_array[j_low]) / (tws_array[j_high] - tws_array[j_low])
-
-    if twa_array[i_high] == twa_array[i_low]:
-        ty = 0.0
-    else:
-        ty = (twa - twa_array[i_low]) / (twa_array[i_high] - twa_array[i_low])
-
-    speed = (v_ll * (1 - tx) * (1 - ty) +
-             v_lh * tx * (1 - ty) +
-             v_hl * (1 - tx) * ty +
-             v_hh * tx * ty)
-
-    return float(max(speed, 0.0))
-
-
-def get_max_speed(speed_matrix):
-    """Vitesse maximale théorique du bateau."""
-    return float(speed_matrix.max())
-
-
-def compute_vmg_upwind(twa_deg: float, boat_speed_kn: float) -> float:
-    """VMG au près (projection sur l'axe du vent) = V * cos(TWA)."""
-    return float(boat_speed_kn * np.cos(np.radians(twa_deg)))
-
-
-def compute_vmg_downwind(twa_deg: float, boat_speed_kn: float) -> float:
-    """VMG au portant: on veut avancer "dans le sens du vent", projection ~ cos(180-TWA)."""
-    return float(boat_speed_kn * np.cos(np.radians(180.0 - twa_deg)))
-
-
-def find_optimal_twa_upwind(tws_kn: float, twa_array, tws_array, speed_matrix, search_min=25, search_max=80, step=1):
-    """Cherche l'angle de près optimal pour TWS donné (max VMG upwind)."""
-    best_twa = None
-    best_vmg = -1e9
-    for twa in range(search_min, search_max + 1, step):
-        v = get_boat_speed(twa, tws_kn, twa_array, tws_array, speed_matrix)
-        vmg = compute_vmg_upwind(twa, v)
-        if vmg > best_vmg:
-            best_vmg = vmg
-            best_twa = float(twa)
-    return best_twa, float(best_vmg)
-
-
-def find_optimal_twa_downwind(tws_kn: float, twa_array, tws_array, speed_matrix, search_min=100, search_max=175, step=1):
-    """Cherche l'angle de portant optimal pour TWS donné (max VMG downwind)."""
-    best_twa = None
-    best_vmg = -1e9
-    for twa in range(search_min, search_max + 1, step):
-        v = get_boat_speed(twa, tws_kn, twa_array, tws_array, speed_matrix)
-        vmg = compute_vmg_downwind(twa, v)
-        if vmg > best_vmg:
-            best_vmg = vmg
-            best_twa = float(twa)
-    return best_twa, float(best_vmg)
+import numpy as np
+import csv
+import os
+from outils import njit
+
+
+def load_polar(path, use_cache=True):
+    """
+    Charge une polaire TSV ou CSV directement en tableaux NumPy.
+    Format: en-tête "TWA\\TWS", tws_1, tws_2, ... puis une ligne par TWA.
+    use_cache=True: tableau mis en cache dans path + ".npy" (relu tant que
+    le fichier source n'est pas plus récent).
+    Returns: (twa_array, tws_array, speed_matrix)
+    """
+    cache_path = path + ".npy"
+    if (use_cache and os.path.exists(cache_path)
+            and os.path.getmtime(cache_path) >= os.path.getmtime(path)):
+        arr = np.load(cache_path)
+    else:
+        with open(path, newline='') as f:
+            first = f.readline()
+        delimiter = '\t' if '\t' in first else ','
+        header = next(csv.reader([first], delimiter=delimiter))
+        rows = np.loadtxt(path, delimiter=delimiter, skiprows=1, ndmin=2)
+        # ligne 0: TWS (colonne 0 sans objet), puis une ligne par TWA
+        arr = np.empty((rows.shape[0] + 1, rows.shape[1]), dtype=np.float64)
+        arr[0, 0] = np.nan
+        arr[0, 1:] = [float(x) for x in header[1:]]
+        arr[1:] = rows
+        if use_cache:
+            try:
+                np.save(cache_path, arr)
+            except OSError:
+                pass  # dossier en lecture seule: pas de cache
+
+    # float64 contigus: types stables pour le noyau compilé
+    twa_array = np.ascontiguousarray(arr[1:, 0])
+    tws_array = np.ascontiguousarray(arr[0, 1:])
+    speed_matrix = np.ascontiguousarray(arr[1:, 1:])
+    return twa_array, tws_array, speed_matrix
+
+
+def load_polar_diagram(csv_path):
+    """
+    Charge polaires depuis CSV (ou TSV).
+    Returns: (twa_array, tws_array, speed_matrix)
+    """
+    twa_array, tws_array, speed_matrix = load_polar(csv_path)
+
+    _POLAR_CURVES.clear()
+    _OPT_TWA_CACHE.clear()
+
+    print(f"✓ Polaires chargées: {len(twa_array)} TWA × {len(tws_array)} TWS")
+    return twa_array, tws_array, speed_matrix
+
+
+@njit(cache=True, fastmath=True)
+def _boat_speed_scalar(twa, tws, twa_array, tws_array, speed_matrix):
+    """Noyau scalaire compilé de get_boat_speed (mêmes conventions)."""
+    twa = abs(twa) % 360.0
+    if twa > 180.0:
+        twa = 360.0 - twa
+
+    if twa < twa_array[0]:
+        twa = twa_array[0]
+    elif twa > twa_array[-1]:
+        twa = twa_array[-1]
+    if tws < tws_array[0]:
+        tws = tws_array[0]
+    elif tws > tws_array[-1]:
+        tws = tws_array[-1]
+
+    i = np.searchsorted(twa_array, twa)
+    j = np.searchsorted(tws_array, tws)
+
+    i_low = max(i - 1, 0)
+    i_high = min(i, len(twa_array) - 1)
+    j_low = max(j - 1, 0)
+    j_high = min(j, len(tws_array) - 1)
+
+    if tws_array[j_high] == tws_array[j_low]:
+        tx = 0.0
+    else:
+        tx = (tws - tws_array[j_low]) / (tws_array[j_high] - tws_array[j_low])
+
+    if twa_array[i_high] == twa_array[i_low]:
+        ty = 0.0
+    else:
+        ty = (twa - twa_array[i_low]) / (twa_array[i_high] - twa_array[i_low])
+
+    speed = (speed_matrix[i_low, j_low] * (1 - tx) * (1 - ty) +
+             speed_matrix[i_low, j_high] * tx * (1 - ty) +
+             speed_matrix[i_high, j_low] * (1 - tx) * ty +
+             speed_matrix[i_high, j_high] * tx * ty)
+    return max(speed, 0.0)
+
+
+def get_boat_speed(twa, tws, twa_array, tws_array, speed_matrix):
+    """
+    Vitesse bateau interpolée depuis polaires.
+    Args:
+        twa: True Wind Angle (degrés)
+        tws: True Wind Speed (nœuds)
+    Returns: Vitesse bateau (nœuds)
+    """
+    return float(_boat_speed_scalar(float(twa), float(tws), twa_array, tws_array, speed_matrix))
+
+
+def get_boat_speed_vec(twas, tws, twa_array, tws_array, speed_matrix):
+    """
+    Version vectorisée de get_boat_speed: plusieurs TWA pour un même TWS.
+    Lecture dans la courbe précalculée du TWS (arrondi à 0.1 nd) + mélange
+    linéaire entre TWA entiers.
+    Returns: vitesses bateau (nœuds), même forme que twas
+    """
+    twas = np.abs(np.asarray(twas, dtype=np.float64)) % 360.0
+    twas = np.where(twas > 180.0, 360.0 - twas, twas)
+    curve = _polar_curve(tws, twa_array, tws_array, speed_matrix)
+    i = np.minimum(twas.astype(np.intp), 179)
+    f = twas - i
+    return curve[i] * (1.0 - f) + curve[i + 1] * f
+
+
+def get_max_speed(speed_matrix):
+    """Vitesse maximale théorique du bateau."""
+    return float(speed_matrix.max())
+
+
+def compute_vmg_upwind(twa_deg: float, boat_speed_kn: float) -> float:
+    """VMG au près (projection sur l'axe du vent) = V * cos(TWA)."""
+    return float(boat_speed_kn * np.cos(np.radians(twa_deg)))
+
+
+def compute_vmg_downwind(twa_deg: float, boat_speed_kn: float) -> float:
+    """VMG au portant: on veut avancer "dans le sens du vent", projection ~ cos(180-TWA)."""
+    return float(boat_speed_kn * np.cos(np.radians(180.0 - twa_deg)))
+
+
+def _polar_row_interp(tws, tws_array, speed_matrix):
+    """
+    Colonne de polaire interpolée à un TWS donné: vitesse pour chaque TWA
+    de twa_array (interpolation linéaire en TWS, bornée aux extrémités).
+    """
+    tws = min(max(float(tws), float(tws_array[0])), float(tws_array[-1]))
+    j = int(np.searchsorted(tws_array, tws))
+    j_low = max(j - 1, 0)
+    j_high = min(j, len(tws_array) - 1)
+    if tws_array[j_high] == tws_array[j_low]:
+        t = 0.0
+    else:
+        t = (tws - tws_array[j_low]) / (tws_array[j_high] - tws_array[j_low])
+    return (1 - t) * speed_matrix[:, j_low] + t * speed_matrix[:, j_high]
+
+
+def _best_vmg(tws_kn, twa_array, tws_array, speed_matrix, twas, proj):
+    """
+    argmax de V(TWA) * proj sur les TWA candidats (une seule passe NumPy),
+    au TWS exact (pas la courbe arrondie à 0.1 nd de get_boat_speed_vec).
+    """
+    row = _polar_row_interp(tws_kn, tws_array, speed_matrix)
+    speeds = np.maximum(np.interp(twas, twa_array, row), 0.0)
+    vmg = speeds * proj
+    k = int(np.argmax(vmg))
+    return float(twas[k]), float(vmg[k])
+
+
+def _optimal_twa(tws_kn, twa_array, tws_array, speed_matrix,
+                 search_min, search_max, step, offset):
+    """
+    max VMG = V(TWA) * cos(TWA - offset) sur [search_min, search_max]:
+    balayage vectorisé exhaustif au pas step (sûr pour les polaires multimodales).
+    """
+    twas = np.arange(search_min, search_max + 1, step, dtype=np.float64)
+    return _best_vmg(tws_kn, twa_array, tws_array, speed_matrix,
+                     twas, np.cos(np.radians(twas - offset)))
+
+
+def find_optimal_twa_upwind(tws_kn: float, twa_array, tws_array, speed_matrix, search_min=25, search_max=80, step=1):
+    """Cherche l'angle de près optimal pour TWS donné (max VMG upwind)."""
+    return _optimal_twa(tws_kn, twa_array, tws_array, speed_matrix,
+                        search_min, search_max, step, 0.0)
+
+
+def find_optimal_twa_downwind(tws_kn: float, twa_array, tws_array, speed_matrix, search_min=100, search_max=175, step=1):
+    """Cherche l'angle de portant optimal pour TWS donné (max VMG downwind)."""
+    return _optimal_twa(tws_kn, twa_array, tws_array, speed_matrix,
+                        search_min, search_max, step, 180.0)
+
+
+# caches par TWS arrondi à 0.1 nd, valables pour la polaire speed_matrix
+# référencée par _POLAR_OWNER (vidés si une autre polaire est utilisée):
+# - _POLAR_CURVES: vitesse aux TWA entiers 0..180 (courbe 1D)
+# - _OPT_TWA_CACHE: optimums (TWA près, TWA portant)
+_POLAR_CURVES = {}
+_OPT_TWA_CACHE = {}
+_POLAR_OWNER = None
+_CURVE_TWAS = np.arange(181, dtype=np.float64)
+
+
+def _check_polar(speed_matrix):
+    """Vide les caches si la polaire n'est plus celle des entrées en cache."""
+    global _POLAR_OWNER
+    if _POLAR_OWNER is not speed_matrix:
+        _POLAR_CURVES.clear()
+        _OPT_TWA_CACHE.clear()
+        _POLAR_OWNER = speed_matrix
+
+
+def _polar_curve(tws, twa_array, tws_array, speed_matrix):
+    """
+    Courbe polaire (181,) aux TWA entiers 0..180 pour le TWS arrondi à 0.1 nd.
+    Calculée une fois par TWS, partagée par toutes les requêtes de vitesse.
+    """
+    _check_polar(speed_matrix)
+    tws_bin = round(float(tws), 1)
+    curve = _POLAR_CURVES.get(tws_bin)
+    if curve is None:
+        row = _polar_row_interp(tws_bin, tws_array, speed_matrix)
+        curve = np.maximum(np.interp(_CURVE_TWAS, twa_array, row), 0.0)
+        _POLAR_CURVES[tws_bin] = curve
+    return curve
+
+
+def optimal_twas_cached(tws_kn, twa_array, tws_array, speed_matrix):
+    """
+    (twa_up, twa_dn) optimaux pour tws_kn, mémorisés par TWS arrondi à 0.1 nd
+    (quantification propre au routeur; find_optimal_twa_* restent au TWS exact).
+    Returns: (twa_up, twa_dn) en degrés
+    """
+    _check_polar(speed_matrix)
+    tws_bin = round(float(tws_kn), 1)
+    hit = _OPT_TWA_CACHE.get(tws_bin)
+    if hit is None:
+        twa_up, _ = find_optimal_twa_upwind(tws_bin, twa_array, tws_array, speed_matrix)
+        twa_dn, _ = find_optimal_twa_downwind(tws_bin, twa_array, tws_array, speed_matrix)
+        hit = (twa_up, twa_dn)
+        _OPT_TWA_CACHE[tws_bin] = hit
+    return hit
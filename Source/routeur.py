@@ -1,13 +1,14 @@
 import heapq
-from datetime import timedelta
+import math
 import numpy as np
 
-from outils import haversine, bearing, destination_point
-from polaire import (
-    get_boat_speed, get_max_speed,
-    find_optimal_twa_upwind, find_optimal_twa_downwind
-)
-from meteo import get_wind_from_grib
+from outils import (HAS_NUMBA, haversine, haversine_vec, bearing, check_coords,
+                    destination_point_vec, geo_step,
+                    HDG_STEPS, HDG_RES_DEG)
+from polaire import get_boat_speed_vec, get_max_speed, optimal_twas_cached
+from meteo import get_wind_from_grib_sec, get_wind_from_grib_batch_sec
+from structure import WaypointPool
+from conventions import KNOT_TO_MPS
 
 
 # ============================================================
@@ -27,6 +28,10 @@ LOW_WIND_THRESHOLD_KN = 6.0
 
 # beam search: garder les meilleurs n candidats par expansion
 DEFAULT_BEAM_WIDTH = 40
+# beam adaptatif: ne garder que les candidats dont la distance restante
+# est <= (1 + gamma) * celle du meilleur (None: désactivé). Optionnel: près du
+# but, le seuil relatif écarte l'autre amure et les options au près
+DEFAULT_BEAM_GAMMA = None
 
 # discrétisation d'état
 DEFAULT_DLAT = 0.05   # degrés
@@ -34,14 +39,16 @@ DEFAULT_DLON = 0.05   # degrés
 # DT est implicite: time_step
 
 
-def _state_key(lat, lon, timestamp, departure, dlat, dlon, dt_seconds):
+def _state_key(lat, lon, t_sec, dlat, dlon, dt_seconds):
     """
     Hash robuste: on discretise sur grille spatio-temporelle explicite.
+    Clé = un seul entier: i et j (signés) sur 20 bits, k sur 24 bits
+    (±524288 cellules, soit ±26000 km à 0.05°).
     """
-    i = int(np.floor(lat / dlat))
-    j = int(np.floor(lon / dlon))
-    k = int(np.floor((timestamp - departure).total_seconds() / dt_seconds))
-    return (i, j, k)
+    i = math.floor(lat / dlat)
+    j = math.floor(lon / dlon)
+    k = t_sec // dt_seconds
+    return (i & 0xFFFFF) | ((j & 0xFFFFF) << 20) | ((k & 0xFFFFFF) << 40)
 
 
 def _sign_of_tack(heading_deg: float, wind_dir_from_deg: float) -> int:
@@ -55,11 +62,13 @@ def _sign_of_tack(heading_deg: float, wind_dir_from_deg: float) -> int:
     return 1 if delta > 0 else -1
 
 
-def _maneuver_penalty(prev_heading, new_heading, wind_dir_from, prev_tack, new_tack):
+def _maneuver_penalty(prev_heading, new_heading, wind_dir_from, prev_tack, new_tack,
+                      prev_twa=None, new_twa=None):
     """
     Détecte virement / empannage grossièrement via changement de signe d'amure.
     - au près: changement de tack => tack
     - au portant: changement de tack => gybe
+    prev_twa / new_twa: TWA déjà connus (recalculés sinon).
     """
     if prev_heading is None:
         return 0.0, None
@@ -72,8 +81,10 @@ def _maneuver_penalty(prev_heading, new_heading, wind_dir_from, prev_tack, new_t
 
     # distinguer près / portant via TWA approx
     # TWA = |wind - heading| dans [0,180]
-    prev_twa = abs(((wind_dir_from - prev_heading + 540.0) % 360.0) - 180.0)
-    new_twa = abs(((wind_dir_from - new_heading + 540.0) % 360.0) - 180.0)
+    if prev_twa is None:
+        prev_twa = abs(((wind_dir_from - prev_heading + 540.0) % 360.0) - 180.0)
+    if new_twa is None:
+        new_twa = abs(((wind_dir_from - new_heading + 540.0) % 360.0) - 180.0)
     twa = 0.5 * (prev_twa + new_twa)
 
     if twa < 90.0:
@@ -87,13 +98,13 @@ def compute_heuristic_admissible(lat, lon, goal_lat, goal_lon, max_speed_kn):
     Ne dépend pas d'un vent local, donc évite des surestimations bizarres.
     """
     dist = haversine(lat, lon, goal_lat, goal_lon)
-    vmax_ms = max_speed_kn * 0.514444  # conversion locale OK mais on pourrait aussi centraliser
+    vmax_ms = max_speed_kn * KNOT_TO_MPS
     if vmax_ms <= 1e-9:
         return 1e9
     return dist / vmax_ms
 
 
-def _generate_candidate_headings(lat, lon, timestamp, goal_lat, goal_lon,
+def _generate_candidate_headings(lat, lon, goal_lat, goal_lon,
                                  wind_speed_kn, wind_dir_from,
                                  twa_arr, tws_arr, speed_mat,
                                  n_spread=6):
@@ -105,9 +116,8 @@ def _generate_candidate_headings(lat, lon, timestamp, goal_lat, goal_lon,
     """
     bearing_goal = bearing(lat, lon, goal_lat, goal_lon)
 
-    # angles optimums polaires (en TWA)
-    twa_up, _ = find_optimal_twa_upwind(wind_speed_kn, twa_arr, tws_arr, speed_mat)
-    twa_dn, _ = find_optimal_twa_downwind(wind_speed_kn, twa_arr, tws_arr, speed_mat)
+    # angles optimums polaires (en TWA), mémorisés par TWS arrondi
+    twa_up, twa_dn = optimal_twas_cached(wind_speed_kn, twa_arr, tws_arr, speed_mat)
 
     base_headings = set()
 
@@ -132,7 +142,7 @@ def _generate_candidate_headings(lat, lon, timestamp, goal_lat, goal_lon,
     return sorted(base_headings)
 
 
-def expand_waypoint(lat, lon, timestamp, g_cost,
+def expand_waypoint(lat, lon, t_sec, g_cost,
                     twa_arr, tws_arr, speed_mat,
                     grib_fields,
                     goal_lat, goal_lon,
@@ -140,51 +150,120 @@ def expand_waypoint(lat, lon, timestamp, g_cost,
                     landmask=None,
                     prev_heading=None,
                     prev_tack=None,
-                    beam_width=DEFAULT_BEAM_WIDTH):
+                    beam_width=DEFAULT_BEAM_WIDTH,
+                    gamma=DEFAULT_BEAM_GAMMA,
+                    wind_cache=None,
+                    wind_key=None,
+                    grib_offset=0.0):
     """
     Génère des waypoints atteignables avec:
     - vent GRIB spatio-temporel interpolé
     - caps restreints "intéressants" (VMG/polaires + goal)
     - manœuvres (tack/gybe) pénalisées
     - coût composite (temps + pénalités)
+    t_sec: secondes (entier) depuis le départ; grib_offset: secondes entre
+    le t0 du GRIB et le départ (pas de datetime dans la boucle).
+    wind_cache / wind_key: dict optionnel {clé d'état: (vent, dir) ou None}
+    pour réutiliser le vent déjà interpolé dans la même cellule spatio-temporelle.
     """
     candidates = []
 
-    # vent spatio-temporel au timestamp courant
-    wind_speed, wind_dir = meteo_client.get_wind(lat, lon, timestamp)
+    # vent spatio-temporel à l'instant courant
+    if wind_cache is not None and wind_key in wind_cache:
+        wind = wind_cache[wind_key]
+    else:
+        try:
+            wind = get_wind_from_grib_sec(lat, lon, grib_offset + t_sec, grib_fields)
+        except ValueError:
+            wind = None  # hors grille GRIB
+        if wind_cache is not None:
+            wind_cache[wind_key] = wind
+    if wind is None:
+        return candidates
+    wind_speed, wind_dir = wind
 
     headings = _generate_candidate_headings(
-        lat, lon, timestamp, goal_lat, goal_lon,
+        lat, lon, goal_lat, goal_lon,
         wind_speed, wind_dir,
         twa_arr, tws_arr, speed_mat
     )
 
-    for heading in headings:
-        # TWA
-        twa = abs((wind_dir - heading + 180) % 360 - 180)
+    # évaluation de tous les caps d'un coup (SoA), dicts construits pour les survivants
+    # caps quantifiés sur la grille HDG_RES_DEG (sin/cos tabulés)
+    hdg_idx = np.unique(np.rint(np.asarray(headings, dtype=np.float64) / HDG_RES_DEG)
+                        .astype(np.int64) % HDG_STEPS)
+    headings = hdg_idx * HDG_RES_DEG
+    twas = np.abs((wind_dir - headings + 180) % 360 - 180)
+    boat_speeds = get_boat_speed_vec(twas, wind_speed, twa_arr, tws_arr, speed_mat)
 
-        # vitesse polaire
-        boat_speed = get_boat_speed(twa, wind_speed, twa_arr, tws_arr, speed_mat)
-        if boat_speed < DEFAULT_MIN_BOAT_SPEED_KN:
+    keep = boat_speeds >= DEFAULT_MIN_BOAT_SPEED_KN
+    if not keep.any():
+        return []
+    headings, twas, boat_speeds = headings[keep], twas[keep], boat_speeds[keep]
+    hdg_idx = hdg_idx[keep]
+
+    # distance parcourue
+    distances_m = boat_speeds * KNOT_TO_MPS * time_step
+    # rang de beam pruning: "promesse" locale (distance restante, puis vitesse)
+    if HAS_NUMBA:
+        n = headings.shape[0]
+        new_lats = np.empty(n)
+        new_lons = np.empty(n)
+        ranks = np.empty(n)
+        geo_step(float(lat), float(lon), hdg_idx, distances_m,
+                 float(goal_lat), float(goal_lon), new_lats, new_lons, ranks)
+    else:
+        new_lats, new_lons = destination_point_vec(lat, lon, headings, distances_m)
+        ranks = haversine_vec(new_lats, new_lons, goal_lat, goal_lon)
+    if landmask:
+        # arrivées à terre écartées en un seul gather, avant le tri et les
+        # tests de segment (plus coûteux)
+        on_sea = landmask.is_sea_vec(new_lats, new_lons)
+        if not on_sea.any():
+            return []
+        headings, twas, boat_speeds = headings[on_sea], twas[on_sea], boat_speeds[on_sea]
+        new_lats, new_lons, ranks = new_lats[on_sea], new_lons[on_sea], ranks[on_sea]
+    if landmask is None and len(ranks) > beam_width:
+        # sans test terre, seuls les beam_width premiers servent: sélection O(n)
+        part = np.argpartition(ranks, beam_width - 1)[:beam_width]
+        order = part[np.lexsort((-boat_speeds[part], ranks[part]))]
+    else:
+        # le test terre peut écarter des candidats: ordre complet nécessaire
+        order = np.lexsort((-boat_speeds, ranks))
+
+    # pénalité vent faible
+    low_wind_pen = 0.0
+    if wind_speed < LOW_WIND_THRESHOLD_KN:
+        low_wind_pen = PENALTY_LOW_WIND
+
+    # TWA du cap précédent sous le vent courant: commun à tous les candidats
+    prev_twa = None
+    if prev_heading is not None:
+        prev_twa = abs(((wind_dir - prev_heading + 540.0) % 360.0) - 180.0)
+
+    next_t_sec = t_sec + time_step
+    cutoff = math.inf
+    for k in order:
+        if len(candidates) >= beam_width or ranks[k] > cutoff:
+            break
+        new_lat = float(new_lats[k])
+        new_lon = float(new_lons[k])
+
+        # terre (testée dans l'ordre du beam: on s'arrête dès qu'il est plein);
+        # supercover: toutes les cellules traversées, aucune île fine sautée
+        if landmask and not landmask.is_path_clear_exact(lat, lon, new_lat, new_lon):
             continue
 
-        # distance parcourue
-        distance_m = boat_speed * 0.514444 * time_step
-
-        new_lat, new_lon = destination_point(lat, lon, heading, distance_m)
-
-        # terre
-        if landmask and not landmask.is_path_clear(lat, lon, new_lat, new_lon, n_samples=6):
-            continue
+        # beam adaptatif, relatif au meilleur candidat atteignable
+        if gamma is not None and not candidates:
+            cutoff = ranks[k] * (1.0 + gamma)
 
         # tack/gybe
+        heading = float(headings[k])
         new_tack = _sign_of_tack(heading, wind_dir)
-        man_pen, man_type = _maneuver_penalty(prev_heading, heading, wind_dir, prev_tack, new_tack)
-
-        # pénalité vent faible
-        low_wind_pen = 0.0
-        if wind_speed < LOW_WIND_THRESHOLD_KN:
-            low_wind_pen = PENALTY_LOW_WIND
+        twa = float(twas[k])
+        man_pen, man_type = _maneuver_penalty(prev_heading, heading, wind_dir, prev_tack, new_tack,
+                                              prev_twa=prev_twa, new_twa=twa)
 
         # coût composite (en secondes "A*")
         composite_step = time_step + man_pen + low_wind_pen
@@ -192,35 +271,27 @@ def expand_waypoint(lat, lon, timestamp, g_cost,
         cand = {
             "lat": new_lat,
             "lon": new_lon,
-            "timestamp": timestamp + timedelta(seconds=time_step),
+            "t_sec": next_t_sec,
             "heading": heading,
-            "boat_speed": boat_speed,
+            "boat_speed": float(boat_speeds[k]),
             "wind_speed": wind_speed,
             "wind_direction": wind_dir,
             "twa": twa,
             "tack": new_tack,
             "maneuver": man_type,  # None / "tack" / "gybe"
             "g_cost": g_cost + composite_step,
-            "g_time": None,  # optionnel si tu veux conserver temps pur
-            "parent": (lat, lon, timestamp),
         }
         candidates.append(cand)
 
-    # beam pruning simple: garder ceux qui minimisent un critère local (ex: g_cost + dist/vmax)
-    if not candidates:
-        return []
-
-    # tri par "promesse" locale: distance restante
-    dists = [haversine(c["lat"], c["lon"], goal_lat, goal_lon) for c in candidates]
-    for c, d in zip(candidates, dists):
-        c["_rank"] = d
+    return candidates
 
-    candidates.sort(key=lambda x: (x["_rank"], -x["boat_speed"]))
-    candidates = candidates[:beam_width]
-    for c in candidates:
-        c.pop("_rank", None)
 
-    return candidates
+def _warn_landmask_oob(landmask, oob_before):
+    """Avertit si la recherche a buté sur le bord de la fenêtre du landmask."""
+    n_oob = landmask.oob_count - oob_before
+    if n_oob > 0:
+        print(f"⚠️ Landmask: {n_oob} successeurs hors de la fenêtre chargée, traités comme "
+              f"terre; élargir la bbox du LandMask si la route longe ce bord.")
 
 
 def calculate_route_astar_fixed(start_lat, start_lon, goal_lat, goal_lon, departure,
@@ -231,7 +302,8 @@ def calculate_route_astar_fixed(start_lat, start_lon, goal_lat, goal_lon, depart
                                max_iterations=50000,
                                arrival_threshold=8000,
                                dlat=DEFAULT_DLAT, dlon=DEFAULT_DLON,
-                               beam_width=DEFAULT_BEAM_WIDTH):
+                               beam_width=DEFAULT_BEAM_WIDTH,
+                               beam_gamma=DEFAULT_BEAM_GAMMA):
     """
     A* (version plus robuste) avec:
     - GRIB temporel interpolé
@@ -239,6 +311,10 @@ def calculate_route_astar_fixed(start_lat, start_lon, goal_lat, goal_lon, depart
     - coût composite
     - beam pruning
     """
+    # départ et arrivée validés ensemble, une fois par calcul (les successeurs
+    # sont construits par destination_point: latitudes valides par construction)
+    check_coords((start_lat, goal_lat), (start_lon, goal_lon))
+
     print(f"Route: ({start_lat:.2f},{start_lon:.2f}) → ({goal_lat:.2f},{goal_lon:.2f})")
     print(f"GRIB: {len(grib_fields)} échéances")
     print(f"Landmask: {'activé' if (landmask and landmask.dataset) else 'désactivé'}")
@@ -246,105 +322,132 @@ def calculate_route_astar_fixed(start_lat, start_lon, goal_lat, goal_lon, depart
 
     # sanity time_step vs GRIB
     if len(grib_fields) >= 2:
-        grib_dt = (grib_fields[1].valid_date - grib_fields[0].valid_date).total_seconds()
+        grib_dt = float(grib_fields.times_sec[1] - grib_fields.times_sec[0])
         if grib_dt > 0 and (time_step % grib_dt != 0) and (grib_dt % time_step != 0):
             print(f"⚠️ Attention: time_step ({time_step}s) pas multiple du pas GRIB ({int(grib_dt)}s).")
 
     if landmask:
-        if not landmask.is_sea(start_lat, start_lon):
-            print("Point de départ sur terre!")
-            return None
-        if not landmask.is_sea(goal_lat, goal_lon):
-            print("Point d'arrivée sur terre!")
-            return None
+        oob_before = landmask.oob_count
+        for name, lat, lon in (("de départ", start_lat, start_lon), ("d'arrivée", goal_lat, goal_lon)):
+            if not landmask.is_sea(lat, lon):
+                if landmask.oob_count > oob_before:
+                    print(f"Point {name} hors de la fenêtre chargée du landmask (bbox trop petite)!")
+                else:
+                    print(f"Point {name} sur terre!")
+                return None
 
     max_speed = get_max_speed(speed_mat)
-
-    start = {
-        "lat": start_lat,
-        "lon": start_lon,
-        "timestamp": departure,
-        "heading": None,
-        "boat_speed": 0.0,
-        "wind_speed": None,
-        "wind_direction": None,
-        "twa": None,
-        "tack": None,
-        "maneuver": None,
-        "g_cost": 0.0,
-        "parent": None,
-    }
-
-    start["h_cost"] = compute_heuristic_admissible(start_lat, start_lon, goal_lat, goal_lon, max_speed)
-    start["f_cost"] = start["g_cost"] + start["h_cost"]
-
-    open_set = [(start["f_cost"], 0, start)]
-    counter = 1
-
-    visited_best_g = {}  # state_key -> best g
-    all_waypoints = {(start_lat, start_lon, departure): start}
+    # heuristique admissible (distance / Vmax) avec Vmax converti une seule fois
+    vmax_ms = max_speed * KNOT_TO_MPS
+    inv_vmax = 1.0 / vmax_ms if vmax_ms > 1e-9 else None
+
+    pool = WaypointPool()
+    start_h = compute_heuristic_admissible(start_lat, start_lon, goal_lat, goal_lon, max_speed)
+    start_id = pool.append(start_lat, start_lon, 0, None, 0.0, None, None, None,
+                           None, None, 0.0, -1, start_h)
+
+    # temps en secondes entières depuis le départ; datetime seulement pour la sortie
+    time_step = int(time_step)
+    grib_offset = (departure - grib_fields.t0).total_seconds()
+
+    # tas (f, node_id), égalités départagées par l'id (croissant = ordre d'insertion),
+    # avec suppression paresseuse: best_g garde le meilleur g poussé par état;
+    # une entrée dont le g est dépassé est périmée et ignorée au pop
+    open_set = [(start_h, start_id)]
+    best_g = {_state_key(start_lat, start_lon, 0, dlat, dlon, time_step): 0.0}
+    wind_cache = {}  # state_key -> (vent, dir) ou None, propre à ce GRIB / ce calcul
 
     iteration = 0
+    current = start_id
     while open_set and iteration < max_iterations:
+        _, current = heapq.heappop(open_set)
+
+        cur_lat = float(pool.lat[current])
+        cur_lon = float(pool.lon[current])
+        cur_g = float(pool.g_cost[current])
+        cur_t = int(pool.t_sec[current])
+
+        skey = _state_key(cur_lat, cur_lon, cur_t, dlat, dlon, time_step)
+        if cur_g > best_g[skey]:
+            continue  # entrée périmée: meilleur chemin poussé depuis
         iteration += 1
-        _, _, current = heapq.heappop(open_set)
 
-        dist = haversine(current["lat"], current["lon"], goal_lat, goal_lon)
+        dist = haversine(cur_lat, cur_lon, goal_lat, goal_lon)
         if iteration % 100 == 0:
-            print(f"Iter {iteration}: dist={dist/1852:.1f}nm, g={current['g_cost']/3600:.1f}h(eq), queue={len(open_set)}")
+            print(f"Iter {iteration}: dist={dist/1852:.1f}nm, g={cur_g/3600:.1f}h(eq), queue={len(open_set)}")
 
         if dist < arrival_threshold:
             print(f"\nArrivée atteinte ! ({iteration} itérations)")
-            path = []
-            c = current
-            while c is not None:
-                path.append(c)
-                if c["parent"] is None:
-                    break
-                c = all_waypoints.get(c["parent"])
-            path.reverse()
-            return path
-
-        skey = _state_key(current["lat"], current["lon"], current["timestamp"],
-                          departure, dlat, dlon, time_step)
-
-        best_g = visited_best_g.get(skey)
-        if best_g is not None and best_g <= current["g_cost"]:
-            continue
-        visited_best_g[skey] = current["g_cost"]
+            if landmask:
+                _warn_landmask_oob(landmask, oob_before)
+            return pool.to_dicts(current, departure)
 
         # expansion
         candidates = expand_waypoint(
-            current["lat"], current["lon"], current["timestamp"], current["g_cost"],
+            cur_lat, cur_lon, cur_t, cur_g,
             twa_arr, tws_arr, speed_mat,
             grib_fields,
             goal_lat, goal_lon,
             time_step=time_step,
             landmask=landmask,
-            prev_heading=current["heading"],
-            prev_tack=current["tack"],
-            beam_width=beam_width
+            prev_heading=pool.heading_of(current),
+            prev_tack=pool.tack_of(current),
+            beam_width=beam_width,
+            gamma=beam_gamma,
+            wind_cache=wind_cache,
+            wind_key=skey,
+            grib_offset=grib_offset
         )
 
+        # vent des cellules filles encore inconnues: une seule interpolation
+        # vectorisée pour toute l'expansion (tous les candidats au même instant)
+        pending_keys = []
+        pending_lats = []
+        pending_lons = []
+
         for cand in candidates:
-            cand["h_cost"] = compute_heuristic_admissible(
-                cand["lat"], cand["lon"], goal_lat, goal_lon, max_speed
+            # garde avant push: état déjà poussé (ou développé) avec un coût au moins aussi bon
+            cand_skey = _state_key(cand["lat"], cand["lon"], cand["t_sec"],
+                                   dlat, dlon, time_step)
+            if best_g.get(cand_skey, math.inf) <= cand["g_cost"]:
+                continue
+            best_g[cand_skey] = cand["g_cost"]
+            if cand_skey not in wind_cache:
+                wind_cache[cand_skey] = None  # réservé (doublons dans l'expansion)
+                pending_keys.append(cand_skey)
+                pending_lats.append(cand["lat"])
+                pending_lons.append(cand["lon"])
+
+            if inv_vmax is None:
+                h_cost = 1e9
+            else:
+                h_cost = haversine(cand["lat"], cand["lon"], goal_lat, goal_lon) * inv_vmax
+            f_cost = cand["g_cost"] + h_cost
+
+            node_id = pool.append(
+                cand["lat"], cand["lon"],
+                cand["t_sec"],
+                cand["heading"], cand["boat_speed"],
+                cand["wind_speed"], cand["wind_direction"], cand["twa"],
+                cand["tack"], cand["maneuver"], cand["g_cost"],
+                current, h_cost
             )
-            cand["f_cost"] = cand["g_cost"] + cand["h_cost"]
 
-            cand_key = (cand["lat"], cand["lon"], cand["timestamp"])
-            all_waypoints[cand_key] = cand
-            cand["parent"] = (current["lat"], current["lon"], current["timestamp"])
+            heapq.heappush(open_set, (f_cost, node_id))
 
-            heapq.heappush(open_set, (cand["f_cost"], counter, cand))
-            counter += 1
+        if pending_keys:
+            ws, wd = get_wind_from_grib_batch_sec(
+                np.array(pending_lats), np.array(pending_lons),
+                grib_offset + cur_t + time_step, grib_fields)
+            for key, w_s, w_d in zip(pending_keys, ws.tolist(), wd.tolist()):
+                # NaN: hors grille ou cellule masquée, comme le ValueError
+                # de get_wind_from_grib_sec (vent None dans les deux cas)
+                wind_cache[key] = None if math.isnan(w_s) else (w_s, w_d)
 
     print(f"\nLimite atteinte ({max_iterations} itérations)")
+    if landmask:
+        _warn_landmask_oob(landmask, oob_before)
     if open_set:
-        last = current
-        dist = haversine(last["lat"], last["lon"], goal_lat, goal_lon)
+        dist = haversine(float(pool.lat[current]), float(pool.lon[current]), goal_lat, goal_lon)
         print(f"Distance finale: {dist/1852:.1f} nm (seuil: {arrival_threshold/1852:.1f} nm)")
     return None
-
-
-print("\nRouteur A* (spatio-temporel + VMG + manœuvres) prêt")
@@ -1,9 +1,13 @@
-from dataclasses import dataclass
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from typing import Optional, List
 
+import numpy as np
 
-@dataclass
+NO_TACK = 99  # amure inconnue dans RouteArrays.tacks
+
+
+@dataclass(slots=True)
 class Waypoint:
     lat: float
     lon: float
@@ -24,14 +28,29 @@ class Waypoint:
         return self.g_cost + self.h_cost
 
 
-@dataclass
+@dataclass(slots=True)
 class Route:
     waypoints: List[Waypoint]
-    start: tuple[float, float]
-    end: tuple[float, float]
+    # float64 (2,): (lat, lon); comparés par __eq__ (== élément par élément sur un tableau)
+    start: np.ndarray = field(compare=False)
+    end: np.ndarray = field(compare=False)
     total_distance: float
     total_time: float
 
+    def __post_init__(self):
+        # accepte aussi des tuples (lat, lon)
+        self.start = np.asarray(self.start, dtype=np.float64).reshape(2)
+        self.end = np.asarray(self.end, dtype=np.float64).reshape(2)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.waypoints == other.waypoints
+                and np.array_equal(self.start, other.start)
+                and np.array_equal(self.end, other.end)
+                and self.total_distance == other.total_distance
+                and self.total_time == other.total_time)
+
     @property
     def distance_nm(self) -> float:
         return self.total_distance / 1852.0
@@ -43,3 +62,150 @@ class Route:
     @property
     def eta(self) -> datetime:
         return self.waypoints[-1].timestamp if self.waypoints else None
+
+
+@dataclass
+class RouteArrays:
+    """
+    Route sous forme de tableaux parallèles (SoA) pour l'affichage.
+    Champs numériques en float64, NaN quand la valeur est inconnue.
+    """
+    lats: np.ndarray
+    lons: np.ndarray
+    twa: np.ndarray
+    wind_speed: np.ndarray
+    wind_direction: np.ndarray
+    heading: np.ndarray
+    boat_speed: np.ndarray
+    tacks: np.ndarray  # int8, NO_TACK si inconnue
+    maneuvers: np.ndarray  # object: None / "tack" / "gybe"
+    timestamps: List[datetime]
+    g_cost: np.ndarray
+
+    def __len__(self):
+        return len(self.lats)
+
+    @classmethod
+    def from_dicts(cls, wps):
+        """Construit les tableaux depuis la liste de waypoints (dicts) du routeur."""
+        def col(key):
+            return np.array([np.nan if wp.get(key) is None else wp[key] for wp in wps],
+                            dtype=np.float64)
+
+        return cls(
+            lats=col("lat"),
+            lons=col("lon"),
+            twa=col("twa"),
+            wind_speed=col("wind_speed"),
+            wind_direction=col("wind_direction"),
+            heading=col("heading"),
+            boat_speed=col("boat_speed"),
+            tacks=np.array([NO_TACK if wp.get("tack") is None else wp["tack"] for wp in wps],
+                           dtype=np.int8),
+            maneuvers=np.array([wp.get("maneuver") for wp in wps], dtype=object),
+            timestamps=[wp["timestamp"] for wp in wps],
+            g_cost=col("g_cost"),
+        )
+
+
+# codes de manœuvre stockés dans WaypointPool.maneuver
+_MANEUVER_NAMES = (None, "tack", "gybe")
+_MANEUVER_CODES = {name: code for code, name in enumerate(_MANEUVER_NAMES)}
+
+
+def _nan_if_none(x):
+    return np.nan if x is None else x
+
+
+def _none_if_nan(x):
+    return None if np.isnan(x) else float(x)
+
+
+class WaypointPool:
+    """
+    Nœuds A* en tableaux parallèles (SoA) indexés par un id entier,
+    au lieu d'un dict par waypoint. parent = id du nœud parent (-1: racine).
+    t_sec: secondes (entier) depuis le départ. Valeurs inconnues: NaN / NO_TACK.
+    """
+    # flottants en float64: to_dicts rend exactement les valeurs reçues par append
+    _COLS = (("lat", np.float64), ("lon", np.float64), ("g_cost", np.float64),
+             ("heading", np.float64), ("boat_speed", np.float64),
+             ("wind_speed", np.float64), ("wind_direction", np.float64),
+             ("twa", np.float64), ("h_cost", np.float64),
+             ("t_sec", np.int64), ("tack", np.int8), ("maneuver", np.int8),
+             ("parent", np.int32))
+
+    def __init__(self, capacity=65536):
+        self.size = 0
+        self.capacity = capacity
+        for name, dtype in self._COLS:
+            setattr(self, name, np.empty(capacity, dtype=dtype))
+
+    def _grow(self):
+        """Double la capacité (copie des lignes utilisées)."""
+        new_cap = 2 * self.capacity
+        for name, _ in self._COLS:
+            old = getattr(self, name)
+            new = np.empty(new_cap, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+        self.capacity = new_cap
+
+    def append(self, lat, lon, t_sec, heading, boat_speed, wind_speed,
+               wind_direction, twa, tack, maneuver, g_cost, parent, h_cost=0.0):
+        """Ajoute un nœud et renvoie son id."""
+        if self.size == self.capacity:
+            self._grow()
+        i = self.size
+        self.lat[i] = lat
+        self.lon[i] = lon
+        self.t_sec[i] = t_sec
+        self.heading[i] = _nan_if_none(heading)
+        self.boat_speed[i] = _nan_if_none(boat_speed)
+        self.wind_speed[i] = _nan_if_none(wind_speed)
+        self.wind_direction[i] = _nan_if_none(wind_direction)
+        self.twa[i] = _nan_if_none(twa)
+        self.tack[i] = NO_TACK if tack is None else tack
+        self.maneuver[i] = _MANEUVER_CODES[maneuver]
+        self.g_cost[i] = g_cost
+        self.h_cost[i] = h_cost
+        self.parent[i] = parent
+        self.size += 1
+        return i
+
+    def heading_of(self, node_id):
+        """Cap du nœud (None si inconnu)."""
+        return _none_if_nan(self.heading[node_id])
+
+    def tack_of(self, node_id):
+        """Amure du nœud (None si inconnue)."""
+        tack = int(self.tack[node_id])
+        return None if tack == NO_TACK else tack
+
+    def path_ids(self, node_id):
+        """Ids du chemin racine -> node_id (remontée des parents)."""
+        ids = []
+        while node_id >= 0:
+            ids.append(node_id)
+            node_id = int(self.parent[node_id])
+        ids.reverse()
+        return ids
+
+    def to_dicts(self, node_id, departure):
+        """Chemin racine -> node_id sous forme de waypoints (dicts) pour l'affichage."""
+        path = []
+        for i in self.path_ids(node_id):
+            path.append({
+                "lat": float(self.lat[i]),
+                "lon": float(self.lon[i]),
+                "timestamp": departure + timedelta(seconds=int(self.t_sec[i])),
+                "heading": self.heading_of(i),
+                "boat_speed": _none_if_nan(self.boat_speed[i]),
+                "wind_speed": _none_if_nan(self.wind_speed[i]),
+                "wind_direction": _none_if_nan(self.wind_direction[i]),
+                "twa": _none_if_nan(self.twa[i]),
+                "tack": self.tack_of(i),
+                "maneuver": _MANEUVER_NAMES[int(self.maneuver[i])],
+                "g_cost": float(self.g_cost[i]),
+            })
+        return path
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# modules du projet: plats dans Source/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Source"))
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+import affichage
+from affichage import _segment_means, _segment_route, route_to_folium_with_wind
+from structure import RouteArrays
+
+
+def test_map_cache_rewrites_file_on_hit(tmp_path):
+    affichage._MAP_CACHE.clear()
+    out = tmp_path / "carte.html"
+    a = ((46.5, -2.5), (43.8, -1.8))
+    b = ((45.0, -3.0), (44.0, -2.0))
+
+    route_to_folium_with_wind(None, *a, filename=str(out))
+    html_a = out.read_text(encoding="utf-8")
+    route_to_folium_with_wind(None, *b, filename=str(out))
+    assert out.read_text(encoding="utf-8") != html_a
+
+    # A de nouveau: reprise du cache, mais le fichier doit redevenir A
+    route_to_folium_with_wind(None, *a, filename=str(out))
+    assert out.read_text(encoding="utf-8") == html_a
+
+
+def test_map_cache_is_bounded(tmp_path):
+    affichage._MAP_CACHE.clear()
+    for k in range(affichage.MAP_CACHE_SIZE + 3):
+        route_to_folium_with_wind(None, (40.0 + k, -2.0), (41.0 + k, -1.0),
+                                  filename=str(tmp_path / f"c{k}.html"))
+    assert len(affichage._MAP_CACHE) == affichage.MAP_CACHE_SIZE
+
+
+def baseline_segments(wps):
+    """Boucle d'origine de _segment_route, en indices (début, fin) inclusifs."""
+    segments = []
+    start = 0
+    for i in range(1, len(wps)):
+        prev, wp = wps[i - 1], wps[i]
+        if prev.get("tack") is not None and wp.get("tack") is not None and prev.get("tack") != wp.get("tack"):
+            segments.append((start, i))
+            start = i
+        elif wp.get("maneuver") in ("tack", "gybe"):
+            segments.append((start, i))
+            start = i
+    if len(wps) - start >= 2:
+        segments.append((start, len(wps) - 1))
+    return segments
+
+
+def baseline_mean_twa(wps, a, b):
+    twas = [wp.get("twa") for wp in wps[a:b + 1] if wp.get("twa") is not None]
+    return float(np.mean(twas)) if twas else None
+
+
+def make_route(rng, n):
+    wps = []
+    for _ in range(n):
+        wps.append({
+            "lat": 45.0, "lon": -2.0, "timestamp": None,
+            "tack": rng.choice([1, 1, 1, -1, -1, -1, None]),
+            "maneuver": rng.choice([None] * 6 + ["tack", "gybe"]),
+            "twa": None if rng.random() < 0.2 else float(rng.uniform(30, 170)),
+        })
+    return wps
+
+
+def test_segmentation_matches_baseline_loop():
+    rng = np.random.default_rng(0)
+    routes = [make_route(rng, n) for n in (1, 2, 3, 5, 20, 60) for _ in range(20)]
+    # cas limites: manœuvre sur le dernier point (tronçon final d'un seul point),
+    # manœuvres consécutives, segment sans TWA connu
+    edge = make_route(rng, 6)
+    for wp, tack, man, twa in zip(edge, (1, 1, -1, -1, -1, 1),
+                                  (None, None, "tack", "gybe", None, "tack"),
+                                  (40.0, None, None, None, 120.0, 50.0)):
+        wp.update(tack=tack, maneuver=man, twa=twa)
+    routes.append(edge)
+
+    for wps in routes:
+        ra = RouteArrays.from_dicts(wps)
+        starts, ends = _segment_route(ra)
+        expected = baseline_segments(wps)
+        assert list(zip(starts.tolist(), ends.tolist())) == expected
+
+        means = _segment_means(ra.twa, starts, ends)
+        for (a, b), mean in zip(expected, means.tolist()):
+            ref = baseline_mean_twa(wps, a, b)
+            if ref is None:
+                assert np.isnan(mean)
+            else:
+                assert mean == pytest.approx(ref)
@@ -0,0 +1,166 @@
+import math
+
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+
+from landmask import LandMask
+
+# 37 x 53: ni H ni W multiples de 8 (tuiles et lignes packées incomplètes)
+H, W = 37, 53
+LON0, LAT_TOP, RES = -5.0, 48.0, 0.01
+
+
+@pytest.fixture(scope="module")
+def mask_file(tmp_path_factory):
+    """GeoTIFF 0=eau / 255=terre aléatoire + masque mer de référence."""
+    rng = np.random.default_rng(0)
+    sea = rng.random((H, W)) < 0.85
+    path = tmp_path_factory.mktemp("landmask") / "mask.tif"
+    with rasterio.open(path, "w", driver="GTiff", height=H, width=W, count=1,
+                       dtype="uint8", crs="EPSG:4326",
+                       transform=from_origin(LON0, LAT_TOP, RES, RES)) as dst:
+        dst.write(np.where(sea, 0, 255).astype(np.uint8), 1)
+    return str(path), sea
+
+
+LAYOUTS = {"u8": {}, "packed": {"packed": True}, "tiled": {"tiled": True}}
+
+
+@pytest.fixture(scope="module")
+def masks(mask_file):
+    path, _ = mask_file
+    lms = {name: LandMask(path, verbose=False, **kw) for name, kw in LAYOUTS.items()}
+    yield lms
+    for lm in lms.values():
+        lm.close()
+
+
+def random_points(rng, n, margin=0.0):
+    lats = rng.uniform(LAT_TOP - H * RES - margin, LAT_TOP + margin, n)
+    lons = rng.uniform(LON0 - margin, LON0 + W * RES + margin, n)
+    return lats, lons
+
+
+def test_is_sea_matches_reference(mask_file, masks):
+    _, sea = mask_file
+    lats, lons = random_points(np.random.default_rng(1), 2000, margin=0.05)
+    rows = np.floor((LAT_TOP - lats) / RES).astype(int)
+    cols = np.floor((lons - LON0) / RES).astype(int)
+    inside = (rows >= 0) & (rows < H) & (cols >= 0) & (cols < W)
+    expected = np.zeros(len(lats), dtype=bool)
+    expected[inside] = sea[rows[inside], cols[inside]]
+    # points trop proches d'un bord de cellule: arrondi de la transformée inverse
+    fr = (LAT_TOP - lats) / RES
+    fc = (lons - LON0) / RES
+    safe = (np.abs(fr - np.round(fr)) > 1e-6) & (np.abs(fc - np.round(fc)) > 1e-6)
+
+    for lm in masks.values():
+        scalar = np.array([lm.is_sea(la, lo) for la, lo in zip(lats, lons)])
+        np.testing.assert_array_equal(scalar[safe], expected[safe])
+        np.testing.assert_array_equal(lm.is_sea_vec(lats, lons), scalar)
+
+
+def supercover_cells(lat1, lon1, lat2, lon2):
+    """Cellules (ligne, colonne) dont l'intérieur coupe le segment (découpage par cellule)."""
+    y0, x0 = (LAT_TOP - lat1) / RES, (lon1 - LON0) / RES
+    y1, x1 = (LAT_TOP - lat2) / RES, (lon2 - LON0) / RES
+    cells = []
+    for r in range(math.floor(min(y0, y1)), math.floor(max(y0, y1)) + 1):
+        for c in range(math.floor(min(x0, x1)), math.floor(max(x0, x1)) + 1):
+            t0, t1 = 0.0, 1.0
+            for p0, dp, lo in ((x0, x1 - x0, c), (y0, y1 - y0, r)):
+                if dp == 0.0:
+                    if not lo < p0 < lo + 1:
+                        t0, t1 = 1.0, 0.0
+                    continue
+                ta, tb = (lo - p0) / dp, (lo + 1 - p0) / dp
+                t0, t1 = max(t0, min(ta, tb)), min(t1, max(ta, tb))
+            if t0 < t1:
+                cells.append((r, c))
+    return cells
+
+
+def test_path_checks_agree_across_layouts(mask_file, masks):
+    _, sea = mask_file
+    rng = np.random.default_rng(2)
+    lat1, lon1 = random_points(rng, 500)
+    # segments courts (quelques cellules) pour avoir des chemins libres
+    lat2 = np.clip(lat1 + rng.uniform(-0.05, 0.05, 500), LAT_TOP - H * RES + 1e-6, LAT_TOP - 1e-6)
+    lon2 = np.clip(lon1 + rng.uniform(-0.05, 0.05, 500), LON0 + 1e-6, LON0 + W * RES - 1e-6)
+
+    ref = masks["u8"]
+    n_clear = 0
+    for seg in zip(lat1, lon1, lat2, lon2):
+        sampled = ref.is_path_clear(*seg, n_samples=16)
+        exact = ref.is_path_clear_exact(*seg)
+        assert sampled == ref.is_path_clear_vec(*seg, n=16)
+        cells = supercover_cells(*seg)
+        assert exact == all(sea[r, c] for r, c in cells)
+        for lm in (masks["packed"], masks["tiled"]):
+            assert lm.is_path_clear(*seg, n_samples=16) == sampled
+            assert lm.is_path_clear(*seg) == ref.is_path_clear(*seg)
+            assert lm.is_path_clear_exact(*seg) == exact
+        n_clear += exact
+    assert 0 < n_clear < 500
+
+
+def test_exact_path_catches_cell_between_samples(tmp_path):
+    # terre sur la seule cellule (1, 1), pixels de 1°: lat = 10 - ligne, lon = colonne
+    land = np.zeros((10, 10), dtype=np.uint8)
+    land[1, 1] = 255
+    path = tmp_path / "island.tif"
+    with rasterio.open(path, "w", driver="GTiff", height=10, width=10, count=1,
+                       dtype="uint8", crs="EPSG:4326", transform=from_origin(0.0, 10.0, 1.0, 1.0)) as dst:
+        dst.write(land, 1)
+    lm = LandMask(str(path), verbose=False)
+    # (ligne 0.9, col 0.1) -> (ligne 1.1, col 2.9): traverse (1, 1) vers col 1.5
+    assert not lm.is_path_clear_exact(9.1, 0.1, 8.9, 2.9)
+    assert not lm.is_path_clear(9.1, 0.1, 8.9, 2.9, n_samples=32)
+    assert lm.is_path_clear_exact(9.5, 0.1, 9.5, 2.9)
+    lm.close()
+
+
+def write_tif(path, data, west, north, res):
+    with rasterio.open(path, "w", driver="GTiff", height=data.shape[0], width=data.shape[1],
+                       count=1, dtype="uint8", crs="EPSG:4326",
+                       transform=from_origin(west, north, res, res)) as dst:
+        dst.write(data, 1)
+    return str(path)
+
+
+def test_convention_detected_on_sparse_land(tmp_path):
+    # un seul pixel terre: absent d'une lecture décimée du raster
+    data = np.zeros((2101, 2101), dtype=np.uint8)
+    data[1001, 1001] = 255
+    lm = LandMask(write_tif(tmp_path / "sparse.tif", data, 0.0, 21.01, 0.01), verbose=False)
+    assert (lm.sea_value, lm.land_value) == (0, 255)
+    assert lm.is_sea(5.0, 5.0)
+    lm.close()
+
+
+def test_bbox_window_keeps_partial_edge_pixels(tmp_path):
+    data = np.zeros((100, 100), dtype=np.uint8)
+    data[0, 0] = 255
+    lm = LandMask(write_tif(tmp_path / "mask.tif", data, 0.0, 10.0, 0.1), verbose=False,
+                  bbox=(3.03, 6.06, 3.03, 6.06))
+    # coins de la bbox dans des pixels couverts en partie: chargés
+    for lat, lon in ((3.035, 3.035), (6.055, 6.055), (3.035, 6.055), (6.055, 3.035)):
+        assert lm.is_sea(lat, lon)
+    assert lm.oob_count == 0
+    lm.close()
+
+
+def test_path_checks_count_out_of_window(tmp_path):
+    data = np.zeros((100, 100), dtype=np.uint8)
+    data[0, 0] = 255
+    lm = LandMask(write_tif(tmp_path / "mask.tif", data, 0.0, 10.0, 0.1), verbose=False,
+                  bbox=(3.0, 6.0, 3.0, 6.0))
+    seg = (4.0, 4.0, 4.0, 7.0)  # sort de la fenêtre à l'est
+    for check in (lm.is_path_clear, lm.is_path_clear_vec, lm.is_path_clear_exact):
+        before = lm.oob_count
+        assert not check(*seg)
+        assert lm.oob_count == before + 1
+    assert lm.is_path_clear(4.0, 4.0, 5.0, 5.0) and lm.oob_count == 3
+    lm.close()
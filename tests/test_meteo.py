@@ -0,0 +1,160 @@
+import math
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from conventions import MPS_TO_KNOT
+from meteo import (GribWindFields, _ascending_flip, _axis_info, get_wind_from_grib_sec,
+                   get_wind_from_grib_batch_sec)
+
+T0 = datetime(2026, 1, 5)
+
+
+def make_fields(lat_axis, lon_axis, u, v, times_sec=(0.0, 3600.0)):
+    """GribWindFields synthétique (axes croissants, u/v en m/s de forme (T, H, W))."""
+    lat_axis = np.asarray(lat_axis, dtype=np.float64)
+    lon_axis = np.asarray(lon_axis, dtype=np.float64)
+    lons, lats = np.meshgrid(lon_axis, lat_axis)
+    uv = np.empty(np.shape(u), dtype=np.complex64)
+    uv.real = u
+    uv.imag = v
+    return GribWindFields(
+        lats=lats, lons=lons,
+        lat_info=_axis_info(lat_axis), lon_info=_axis_info(lon_axis),
+        times=[T0] * len(times_sec), t0=T0,
+        times_sec=np.asarray(times_sec, dtype=np.float64),
+        uv_stack=uv,
+    )
+
+
+def random_fields(rng, lat_axis, lon_axis, n_times=2):
+    shape = (n_times, len(lat_axis), len(lon_axis))
+    return make_fields(lat_axis, lon_axis,
+                       rng.uniform(-15, 15, shape), rng.uniform(-15, 15, shape),
+                       times_sec=np.arange(n_times) * 3600.0)
+
+
+REGULAR = (np.linspace(43.0, 47.0, 9), np.linspace(-4.0, 0.0, 11))
+IRREGULAR = (np.array([43.0, 43.3, 44.0, 44.2, 45.5, 46.0, 47.0]),
+             np.array([-4.0, -3.1, -3.0, -2.2, -1.0, -0.4, 0.0]))
+
+
+@pytest.mark.parametrize("axes", [REGULAR, IRREGULAR], ids=["regular", "irregular"])
+def test_scalar_masked_cell_raises(axes):
+    fields = random_fields(np.random.default_rng(0), *axes)
+    fields.uv_stack[:, 3, 4] = complex(np.nan, np.nan)
+    lat = 0.5 * (axes[0][3] + axes[0][4])
+    lon = 0.5 * (axes[1][3] + axes[1][4])
+    with pytest.raises(ValueError):
+        get_wind_from_grib_sec(lat, lon, 1800.0, fields)
+    # loin de la valeur masquée: vent valide
+    speed, direction = get_wind_from_grib_sec(axes[0][0] + 0.01, axes[1][0] + 0.01, 1800.0, fields)
+    assert np.isfinite(speed) and np.isfinite(direction)
+
+
+@pytest.mark.parametrize("axes", [REGULAR, IRREGULAR], ids=["regular", "irregular"])
+def test_scalar_outside_grid_raises(axes):
+    fields = random_fields(np.random.default_rng(1), *axes)
+    with pytest.raises(ValueError):
+        get_wind_from_grib_sec(axes[0][-1] + 0.5, axes[1][0] + 0.1, 0.0, fields)
+
+
+@pytest.mark.parametrize("axes", [REGULAR, IRREGULAR], ids=["regular", "irregular"])
+def test_batch_matches_scalar(axes):
+    rng = np.random.default_rng(2)
+    fields = random_fields(rng, *axes, n_times=3)
+    fields.uv_stack[1, 2, 5] = complex(np.nan, np.nan)  # cellule masquée
+    lats = rng.uniform(axes[0][0], axes[0][-1], 300)
+    lons = rng.uniform(axes[1][0], axes[1][-1], 300)
+    # points dans les cellules voisines de la valeur masquée
+    lats[:4] = 0.5 * (axes[0][1:3] + axes[0][2:4]).repeat(2)
+    lons[:4] = np.tile(0.5 * (axes[1][4:6] + axes[1][5:7]), 2)
+
+    for q in (0.0, 2700.0, 7200.0):
+        speeds, dirs = get_wind_from_grib_batch_sec(lats, lons, q, fields)
+        for lat, lon, s_b, d_b in zip(lats, lons, speeds, dirs):
+            try:
+                s, d = get_wind_from_grib_sec(lat, lon, q, fields)
+            except ValueError:
+                assert np.isnan(s_b) and np.isnan(d_b)
+                continue
+            assert s_b == pytest.approx(s, rel=1e-6, abs=1e-6)
+            assert abs((d_b - d + 180.0) % 360.0 - 180.0) < 1e-4
+    assert np.isnan(get_wind_from_grib_batch_sec(lats[:4], lons[:4], 3600.0, fields)[0]).all()
+
+
+def reference_wind(fields, lat, lon, q):
+    """Bilinéaire spatial + linéaire temporel direct, en float64."""
+    lat_axis, lon_axis = fields.lats[:, 0], fields.lons[0, :]
+    i = min(max(int(np.searchsorted(lat_axis, lat, side="right")) - 1, 0), len(lat_axis) - 2)
+    j = min(max(int(np.searchsorted(lon_axis, lon, side="right")) - 1, 0), len(lon_axis) - 2)
+    ty = (lat - lat_axis[i]) / (lat_axis[i + 1] - lat_axis[i])
+    tx = (lon - lon_axis[j]) / (lon_axis[j + 1] - lon_axis[j])
+
+    ts = fields.times_sec
+    q = min(max(q, ts[0]), ts[-1])
+    k1 = min(max(int(np.searchsorted(ts, q)), 1), len(ts) - 1)
+    alpha = (q - ts[k1 - 1]) / (ts[k1] - ts[k1 - 1])
+
+    uv = fields.uv_stack.astype(np.complex128)
+    z = 0j
+    for k, wt in ((k1 - 1, 1.0 - alpha), (k1, alpha)):
+        z += wt * ((1 - tx) * (1 - ty) * uv[k, i, j] + tx * (1 - ty) * uv[k, i, j + 1] +
+                   (1 - tx) * ty * uv[k, i + 1, j] + tx * ty * uv[k, i + 1, j + 1])
+    speed = abs(z) * MPS_TO_KNOT
+    return speed, (270.0 - math.degrees(math.atan2(z.imag, z.real))) % 360.0
+
+
+def assert_wind_close(speed, direction, ref):
+    assert speed == pytest.approx(ref[0], rel=1e-5, abs=1e-5)
+    if ref[0] > 0.1:
+        assert abs((direction - ref[1] + 180.0) % 360.0 - 180.0) < 1e-3
+
+
+@pytest.mark.parametrize("axes", [REGULAR, IRREGULAR], ids=["regular", "irregular"])
+def test_scalar_and_batch_match_float64_reference(axes):
+    rng = np.random.default_rng(3)
+    fields = random_fields(rng, *axes, n_times=3)
+    lats = rng.uniform(axes[0][0], axes[0][-1], 200)
+    lons = rng.uniform(axes[1][0], axes[1][-1], 200)
+    # noeuds et bords exacts
+    lats[:3] = axes[0][[0, 3, -1]]
+    lons[:3] = axes[1][[0, 2, -1]]
+
+    for q in (-600.0, 0.0, 1000.0, 3600.0, 5000.0, 9000.0):
+        speeds, dirs = get_wind_from_grib_batch_sec(lats, lons, q, fields)
+        for lat, lon, s_b, d_b in zip(lats, lons, speeds, dirs):
+            ref = reference_wind(fields, lat, lon, q)
+            assert_wind_close(*get_wind_from_grib_sec(lat, lon, q, fields), ref)
+            assert_wind_close(s_b, d_b, ref)
+
+
+@pytest.mark.parametrize("axes", [REGULAR, IRREGULAR], ids=["regular", "irregular"])
+@pytest.mark.parametrize("lat_desc", [False, True])
+@pytest.mark.parametrize("lon_desc", [False, True])
+def test_descending_axes_are_flipped(axes, lat_desc, lon_desc):
+    lat_axis = axes[0][::-1] if lat_desc else axes[0]
+    lon_axis = axes[1][::-1] if lon_desc else axes[1]
+    lons, lats = np.meshgrid(lon_axis, lat_axis)
+    # champs affines: l'interpolation bilinéaire est exacte
+    u = 2.0 + 0.5 * lats - 1.5 * lons
+    v = -3.0 + 0.2 * lats + lons
+
+    flip = _ascending_flip(lats, lons)
+    assert (np.diff(lats[flip][:, 0]) > 0).all()
+    assert (np.diff(lons[flip][0, :]) > 0).all()
+    fields = make_fields(lats[flip][:, 0], lons[flip][0, :],
+                         np.stack([u[flip]] * 2), np.stack([v[flip]] * 2))
+    np.testing.assert_array_equal(fields.lats, lats[flip])
+
+    rng = np.random.default_rng(4)
+    qlats = rng.uniform(axes[0][0], axes[0][-1], 50)
+    qlons = rng.uniform(axes[1][0], axes[1][-1], 50)
+    speeds, _ = get_wind_from_grib_batch_sec(qlats, qlons, 1800.0, fields)
+    for lat, lon, s_b in zip(qlats, qlons, speeds):
+        uu = 2.0 + 0.5 * lat - 1.5 * lon
+        vv = -3.0 + 0.2 * lat + lon
+        expected = math.hypot(uu, vv) * MPS_TO_KNOT
+        assert get_wind_from_grib_sec(lat, lon, 1800.0, fields)[0] == pytest.approx(expected, rel=1e-5)
+        assert s_b == pytest.approx(expected, rel=1e-5)
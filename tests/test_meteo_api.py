@@ -0,0 +1,41 @@
+from datetime import datetime
+
+import pytest
+
+import meteo_api
+from meteo_api import OpenMeteoClient
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+def station(speed_kmh, direction):
+    return {"hourly": {"time": ["2025-12-08T00:00", "2025-12-08T01:00"],
+                       "wind_speed_10m": [speed_kmh, speed_kmh],
+                       "wind_direction_10m": [direction, direction]}}
+
+
+def test_prefetch_rejects_missing_stations(monkeypatch):
+    # 3 points demandés, 2 stations renvoyées: erreur explicite, rien en cache
+    monkeypatch.setattr(meteo_api.requests, "get",
+                        lambda *a, **kw: FakeResponse([station(18.52, 270.0), station(20.0, 280.0)]))
+    client = OpenMeteoClient()
+    with pytest.raises(ValueError, match="2 stations pour 3 points"):
+        client.prefetch([(46.0, -3.0), (46.1, -3.0), (46.2, -3.0)])
+    assert client._stations == {}
+
+
+def test_get_wind_single_point(monkeypatch):
+    monkeypatch.setattr(meteo_api.requests, "get",
+                        lambda *a, **kw: FakeResponse(station(18.52, 270.0)))
+    speed, direction = OpenMeteoClient().get_wind(46.0, -3.0, datetime(2025, 12, 8, 1, 20))
+    assert speed == pytest.approx(10.0, abs=1e-3)
+    assert direction == 270.0
@@ -0,0 +1,23 @@
+
+import numpy as np
+import pytest
+
+from outils import HDG_RES_DEG, destination_point, geo_step, haversine, haversine_vec
+
+
+def test_geo_step_matches_scalar_kernels():
+    rng = np.random.default_rng(0)
+    hdg_idx = rng.integers(0, 3600, 50).astype(np.int64)
+    dist = rng.uniform(1000.0, 30000.0, 50)
+    lat, lon, goal_lat, goal_lon = 46.5, -2.5, 43.8, -1.8
+    out_lat, out_lon, out_dist = np.empty(50), np.empty(50), np.empty(50)
+    geo_step(lat, lon, hdg_idx, dist, goal_lat, goal_lon, out_lat, out_lon, out_dist)
+
+    tol_deg, tol_m = 1e-9, 0.05
+    for k in range(50):
+        la, lo = destination_point(lat, lon, hdg_idx[k] * HDG_RES_DEG, dist[k])
+        assert out_lat[k] == pytest.approx(la, abs=tol_deg)
+        assert out_lon[k] == pytest.approx(lo, abs=tol_deg)
+        assert out_dist[k] == pytest.approx(haversine(la, lo, goal_lat, goal_lon), abs=tol_m)
+    np.testing.assert_allclose(out_dist, haversine_vec(out_lat, out_lon, goal_lat, goal_lon),
+                               atol=tol_m)
@@ -0,0 +1,30 @@
+import os
+
+import pytest
+
+from polaire import (compute_vmg_downwind, compute_vmg_upwind, find_optimal_twa_downwind,
+                     find_optimal_twa_upwind, get_boat_speed, load_polar)
+
+POLAR_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "docs", "Figaro2.csv")
+
+
+def baseline_optimum(tws, polar, twas, vmg):
+    """Boucle d'origine: premier TWA entier de VMG maximal, au TWS exact."""
+    best_twa, best_vmg = None, -1e9
+    for twa in twas:
+        v = vmg(twa, get_boat_speed(twa, tws, *polar))
+        if v > best_vmg:
+            best_twa, best_vmg = float(twa), v
+    return best_twa, best_vmg
+
+
+@pytest.mark.parametrize("tws", [3.0, 7.23, 11.96, 14.04, 18.5, 33.33, 70.0])
+def test_optimal_twa_uses_exact_tws(tws):
+    polar = load_polar(POLAR_PATH, use_cache=False)
+    up = find_optimal_twa_upwind(tws, *polar)
+    dn = find_optimal_twa_downwind(tws, *polar)
+    ref_up = baseline_optimum(tws, polar, range(25, 81), compute_vmg_upwind)
+    ref_dn = baseline_optimum(tws, polar, range(100, 176), compute_vmg_downwind)
+    assert up[0] == ref_up[0] and up[1] == pytest.approx(ref_up[1], rel=1e-9, abs=1e-12)
+    assert dn[0] == ref_dn[0] and dn[1] == pytest.approx(ref_dn[1], rel=1e-9, abs=1e-12)
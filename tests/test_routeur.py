@@ -0,0 +1,122 @@
+import os
+from datetime import timedelta
+
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+
+from landmask import LandMask
+from outils import haversine
+from polaire import load_polar
+from routeur import _state_key, calculate_route_astar_fixed, expand_waypoint
+from test_meteo import T0, make_fields
+
+POLAR_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "docs", "Figaro2.csv")
+
+
+def unpack_state_key(key):
+    """(i, j, k) d'une clé _state_key (i et j signés sur 20 bits)."""
+    i = key & 0xFFFFF
+    j = (key >> 20) & 0xFFFFF
+    k = key >> 40
+    i -= (i & 0x80000) << 1
+    j -= (j & 0x80000) << 1
+    return i, j, k
+
+
+@pytest.mark.parametrize("lat, lon, t_sec", [
+    (46.52, -2.47, 7200), (-33.91, 151.2, 0), (0.01, -0.01, 3599),
+    (-89.99, -179.99, 36000), (43.01, 0.02, 123456),
+])
+def test_state_key_round_trip(lat, lon, t_sec):
+    dlat, dlon, dt = 0.05, 0.05, 3600
+    key = _state_key(lat, lon, t_sec, dlat, dlon, dt)
+    assert unpack_state_key(key) == (np.floor(lat / dlat), np.floor(lon / dlon), t_sec // dt)
+    # cellules voisines: clés distinctes
+    neighbours = {_state_key(lat + a * dlat, lon + b * dlon, t_sec + c * dt, dlat, dlon, dt)
+                  for a in (-1, 0, 1) for b in (-1, 0, 1) for c in (0, 1)}
+    assert len(neighbours) == 18
+
+
+def test_route_constant_wind_without_landmask():
+    twa_arr, tws_arr, speed_mat = load_polar(POLAR_PATH, use_cache=False)
+    lat_axis, lon_axis = np.linspace(43.0, 48.0, 11), np.linspace(-5.0, 0.0, 11)
+    shape = (3, len(lat_axis), len(lon_axis))
+    # vent de nord-ouest ~15 nd partout, 48 h d'échéances
+    fields = make_fields(lat_axis, lon_axis, np.full(shape, 5.5), np.full(shape, -5.5),
+                         times_sec=(0.0, 86400.0, 172800.0))
+
+    start, goal = (46.0, -3.5), (45.2, -1.8)
+    route = calculate_route_astar_fixed(*start, *goal, T0, twa_arr, tws_arr, speed_mat,
+                                        fields, time_step=1800, max_iterations=5000)
+    assert route is not None
+    assert (route[0]["lat"], route[0]["lon"]) == start
+    assert haversine(route[-1]["lat"], route[-1]["lon"], *goal) < 8000
+
+    elapsed = (route[-1]["timestamp"] - route[0]["timestamp"]).total_seconds()
+    assert all(b["timestamp"] - a["timestamp"] == timedelta(seconds=1800)
+               for a, b in zip(route, route[1:]))
+    # jamais plus rapide que la vitesse max de la polaire
+    min_time = (haversine(*start, *goal) - 8000) / (speed_mat.max() * 1852 / 3600)
+    assert elapsed >= min_time
+    for wp in route[1:]:
+        assert wp["wind_speed"] == pytest.approx(np.hypot(5.5, 5.5) * 3600 / 1852, rel=1e-4)
+        assert wp["wind_direction"] == pytest.approx(315.0, abs=1e-3)
+
+
+def write_mask(path, land, west, north, res=0.01):
+    """GeoTIFF 0=eau / 255=terre, coin nord-ouest (west, north)."""
+    with rasterio.open(path, "w", driver="GTiff", height=land.shape[0], width=land.shape[1],
+                       count=1, dtype="uint8", crs="EPSG:4326",
+                       transform=from_origin(west, north, res, res)) as dst:
+        dst.write(np.where(land, 255, 0).astype(np.uint8), 1)
+    return str(path)
+
+
+def test_expand_waypoint_skips_land(tmp_path):
+    twa_arr, tws_arr, speed_mat = load_polar(POLAR_PATH, use_cache=False)
+    shape = (2, 11, 11)
+    fields = make_fields(np.linspace(43.0, 48.0, 11), np.linspace(-5.0, 0.0, 11),
+                         np.full(shape, 5.5), np.full(shape, -5.5))
+    # terre à l'est de -3.0°, au sud de 46.0° (0=eau, 255=terre)
+    lons, lats = np.meshgrid(-4.0 + 0.01 * (np.arange(200) + 0.5), 47.0 - 0.01 * (np.arange(200) + 0.5))
+    land = (lons > -3.0) & (lats < 46.0)
+    lm = LandMask(write_mask(tmp_path / "mask.tif", land, -4.0, 47.0), verbose=False)
+
+    args = (46.05, -3.05, 0, 0.0, twa_arr, tws_arr, speed_mat, fields, 45.5, -2.5)
+    free = expand_waypoint(*args, beam_width=100, gamma=None)
+    kept = expand_waypoint(*args, landmask=lm, beam_width=100, gamma=None)
+
+    assert kept and len(kept) < len(free)
+    for cand in kept:
+        assert lm.is_sea(cand["lat"], cand["lon"])
+        assert lm.is_path_clear_exact(46.05, -3.05, cand["lat"], cand["lon"])
+    # mêmes candidats que sans masque, moins ceux qui touchent la terre
+    expected = [c for c in free
+                if lm.is_path_clear_exact(46.05, -3.05, c["lat"], c["lon"])]
+    assert kept == expected
+    lm.close()
+
+
+def test_route_warns_when_leaving_landmask_window(tmp_path, capsys):
+    twa_arr, tws_arr, speed_mat = load_polar(POLAR_PATH, use_cache=False)
+    shape = (2, 11, 11)
+    fields = make_fields(np.linspace(43.0, 48.0, 11), np.linspace(-5.0, 0.0, 11),
+                         np.full(shape, 5.5), np.full(shape, -5.5))
+    # bande de mer de 0.2° de haut: une partie des successeurs en sort
+    land = np.zeros((20, 200), dtype=bool)
+    land[-1, 0] = True  # une cellule terre: convention 0=eau/255=terre détectée
+    lm = LandMask(write_mask(tmp_path / "mask.tif", land, -3.6, 46.1), verbose=False)
+
+    calculate_route_astar_fixed(46.0, -3.5, 46.0, -1.8, T0, twa_arr, tws_arr, speed_mat,
+                                fields, landmask=lm, max_iterations=200)
+    assert "hors de la fenêtre chargée" in capsys.readouterr().out
+
+    # arrivée hors fenêtre: signalée comme telle, pas comme de la terre
+    assert calculate_route_astar_fixed(46.0, -3.5, 45.2, -1.8, T0, twa_arr, tws_arr, speed_mat,
+                                       fields, landmask=lm) is None
+    out = capsys.readouterr().out
+    assert "Point d'arrivée hors de la fenêtre" in out and "sur terre" not in out
+    lm.close()
@@ -0,0 +1,62 @@
+import numpy as np
+
+from structure import NO_TACK, Route, Waypoint, WaypointPool
+from test_meteo import T0
+
+
+def test_pool_grows_and_keeps_paths():
+    pool = WaypointPool(capacity=2)
+    root = pool.append(46.0, -3.0, 0, None, None, None, None, None, None, None, 0.0, -1)
+    # deux branches depuis la racine: capacité doublée plusieurs fois
+    left = [root]
+    right = [root]
+    for k in range(1, 8):
+        left.append(pool.append(46.0 + k, -3.0, 1800 * k, 90.0, 6.5, 14.0, 315.0, 135.0,
+                                1, "gybe" if k == 3 else None, 10.0 * k, left[-1], 5.0))
+        right.append(pool.append(46.0 - k, -3.0, 1800 * k, 180.0, 5.0, 12.0, 300.0, 120.0,
+                                 -1, None, 20.0 * k, right[-1]))
+
+    assert pool.size == 15
+    assert pool.capacity == 16
+    assert pool.path_ids(left[-1]) == left
+    assert pool.path_ids(right[-1]) == right
+    assert pool.path_ids(root) == [root]
+    # valeurs relues après les copies de _grow
+    np.testing.assert_array_equal(pool.lat[left], 46.0 + np.arange(8))
+    np.testing.assert_array_equal(pool.g_cost[right], 20.0 * np.arange(8))
+    assert pool.tack[root] == NO_TACK and np.isnan(pool.heading[root])
+    assert pool.tack_of(root) is None and pool.heading_of(root) is None
+    assert pool.tack_of(right[1]) == -1 and pool.heading_of(right[1]) == 180.0
+
+    wps = pool.to_dicts(left[-1], T0)
+    assert [wp["maneuver"] for wp in wps] == [None, None, None, "gybe", None, None, None, None]
+    assert wps[0]["tack"] is None and wps[0]["twa"] is None
+    assert wps[-1]["tack"] == 1 and wps[-1]["g_cost"] == 70.0
+    assert (wps[-1]["timestamp"] - T0).total_seconds() == 1800 * 7
+
+
+def test_pool_dicts_return_appended_values():
+    pool = WaypointPool()
+    vals = (123.456789, 6.123456789, 14.987654321, 301.23456789, 41.2345678)
+    i = pool.append(46.1, -2.3, 60, *vals, 1, "tack", 1.5, -1, 2.75)
+    wp = pool.to_dicts(i, T0)[0]
+    # mêmes flottants qu'en entrée (pas d'arrondi float32)
+    assert (wp["heading"], wp["boat_speed"], wp["wind_speed"],
+            wp["wind_direction"], wp["twa"]) == vals
+    assert all(type(wp[k]) is float for k in ("heading", "twa", "g_cost"))
+    assert pool.h_cost[i] == 2.75
+
+
+def test_route_equality_with_array_endpoints():
+    a = Route([], (46.5, -2.5), (43.8, -1.8), 1000.0, 3600.0)
+    assert a == Route([], np.array([46.5, -2.5]), [43.8, -1.8], 1000.0, 3600.0)
+    assert a != Route([], (46.5, -2.5), (43.8, -1.7), 1000.0, 3600.0)
+    assert a != Route([], (46.5, -2.5), (43.8, -1.8), 1000.0, 7200.0)
+
+
+def test_waypoint_f_cost_follows_cost_writes():
+    wp = Waypoint(46.0, -3.0, T0, 90.0, 6.0, g_cost=10.0, h_cost=5.0)
+    assert wp.f_cost == 15.0
+    wp.g_cost = 20.0
+    wp.h_cost = 1.0
+    assert wp.f_cost == 21.0